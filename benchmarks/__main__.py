@@ -0,0 +1,103 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Benchmarking tool for every HMM backend over a registry of workloads"""
+import argparse
+import json
+
+from benchmarks.suite import add_arguments, run
+
+__author__ = "Elmer Nocon, Abien Fred Agarap"
+
+
+def report(results: dict):
+
+    header = f"{'workload':<22}{'backend':<22}{'construct (ms)':>22}{'decode (ms)':>22}"
+    if results["config"].get("memory"):
+        header += f"{'allocated (MB)':>16}{'RSS increase (MB)':>19}"
+    print(header)
+
+    for result in results["results"]:
+        line = f"{result['workload']:<22}{result['backend']:<22}"
+        if "decode" not in result:
+            reason = result.get("error") or f"Skipped, {result['skipped']}"
+            print(f"{line}{reason.splitlines()[0]}")
+            continue
+        for timing in ("construct", "decode"):
+            median = result[timing]["median"] / 1e6
+            iqr = result[timing]["iqr"] / 1e6
+            line += f"{median:>12.3f} ± {iqr:<7.3f}"
+        if "memory" in result:
+            allocated = result["memory"]["allocated_peak"] / 2 ** 20
+            increase = result["memory"]["rss_increase"]
+            line += f"{allocated:>16.3f}"
+            line += f"{increase / 2 ** 20:>19.3f}" if increase is not None else ""
+        print(line)
+
+    # Decoding time as a power of the size along every series of workloads
+    if results["complexity"]:
+        print()
+        print(f"{'series':<22}{'backend':<22}{'exponent':>10}{'R^2':>8}  sizes")
+    for fit in results["complexity"]:
+        print(
+            f"{fit['series']:<22}{fit['backend']:<22}{fit['exponent']:>10.2f}"
+            f"{fit['r2']:>8.3f}  {fit['sizes'][0]}-{fit['sizes'][-1]}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmarking HMM backends"
+    )
+    group = parser.add_argument_group("Parameters")
+    add_arguments(group)
+    group.add_argument(
+        "-o",
+        "--output",
+        required=False,
+        type=str,
+        help="Export the results to a JSON file.",
+    )
+    arguments = parser.parse_args()
+    return arguments
+
+
+def main(arguments):
+
+    results = run(
+        arguments.backends,
+        arguments.workloads,
+        arguments.repeat,
+        arguments.warmup,
+        arguments.seed,
+        arguments.memory,
+        arguments.budget,
+    )
+    report(results)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    main(arguments)
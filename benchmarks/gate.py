@@ -0,0 +1,300 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Regression gate comparing the benchmark suite against stored baselines"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from benchmarks.suite import add_arguments, run
+
+__author__ = "Elmer Nocon, Abien Fred Agarap"
+
+# Timings compared between the baseline and the new results
+TIMINGS = ["construct", "decode"]
+
+# Largest number of sample pairs for the exact distribution of U
+EXACT_PAIRS = 2500
+
+
+def u_distribution(n: int, m: int) -> List[int]:
+
+    # f(i, j)[u], number of orderings of i and j samples with U = u, either the
+    # largest sample is one of the i and beats all j others, or one of the j
+    f = [[[1] for j in range(m + 1)] for i in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            counts = [0] * (i * j + 1)
+            for u, count in enumerate(f[i - 1][j]):
+                counts[u + j] += count
+            for u, count in enumerate(f[i][j - 1]):
+                counts[u] += count
+            f[i][j] = counts
+    return f[n][m]
+
+
+def mann_whitney_u(x: List[float], y: List[float]) -> Tuple[float, float]:
+
+    # U statistic of x against y and the one-sided p-value of x being larger
+    n, m = len(x), len(y)
+    u = sum([1.0 if a > b else 0.5 if a == b else 0.0 for a in x for b in y])
+
+    # Exact without ties, the normal approximation with tie correction otherwise
+    ties = len(set(x) | set(y)) < n + m
+    if not ties and n * m <= EXACT_PAIRS:
+        counts = u_distribution(n, m)
+        return u, sum(counts[int(u) :]) / sum(counts)
+
+    tie_term = sum([t ** 3 - t for t in Counter(x + y).values()])
+    mu = n * m / 2
+    sigma = math.sqrt(n * m / 12 * ((n + m + 1) - tie_term / ((n + m) * (n + m - 1))))
+    if sigma == 0:
+        return u, 1.0
+    z = (u - mu - 0.5) / sigma
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def minimum_p(n: int, m: int) -> float:
+
+    # Smallest one-sided p-value of n against m samples, every sample of x
+    # larger than every sample of y, one of the (n + m choose n) orderings
+    return 1 / math.comb(n + m, n)
+
+
+def load_baseline(directory: str, workload: str) -> Dict[str, object]:
+    path = os.path.join(directory, f"{workload}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baselines(directory: str, results: Dict[str, object]):
+
+    # One file per workload, so workloads can be run and updated on their own
+    os.makedirs(directory, exist_ok=True)
+    workloads = {}
+    for result in results["results"]:
+        workloads.setdefault(result["workload"], []).append(result)
+    for workload, entries in workloads.items():
+        with open(os.path.join(directory, f"{workload}.json"), "w") as file:
+            json.dump({**results, "results": entries}, file, indent=2)
+
+
+def compare(
+    directory: str,
+    results: Dict[str, object],
+    threshold: float = 0.1,
+    alpha: float = 0.01,
+    allow_environment: bool = False,
+) -> List[Dict[str, object]]:
+
+    # A regression is a median slowdown beyond the threshold that is also
+    # significant, noise alone rarely passes both
+    comparisons = []
+    for result in results["results"]:
+        baseline = load_baseline(directory, result["workload"]) or {"results": []}
+
+        # Timings of another machine or library versions are not comparable
+        mismatch = [
+            key
+            for key, value in baseline.get("environment", {}).items()
+            if key in results.get("environment", {})
+            and results["environment"][key] != value
+        ]
+        entries = [
+            entry
+            for entry in baseline["results"]
+            if entry["backend"] == result["backend"] and "decode" in entry
+        ]
+        for timing in TIMINGS:
+            comparison = {
+                "workload": result["workload"],
+                "backend": result["backend"],
+                "timing": timing,
+            }
+            if "error" in result:
+                comparison["status"] = "error"
+            elif "skipped" in result:
+                comparison["status"] = "skipped"
+            elif not entries:
+                comparison["status"] = "no baseline"
+            elif mismatch and not allow_environment:
+                comparison["status"] = "environment mismatch"
+                comparison["mismatch"] = mismatch
+            else:
+                old, new = entries[0][timing], result[timing]
+                ratio = new["median"] / old["median"]
+                _, p_slower = mann_whitney_u(new["samples"], old["samples"])
+                _, p_faster = mann_whitney_u(old["samples"], new["samples"])
+                if minimum_p(len(new["samples"]), len(old["samples"])) >= alpha:
+                    status = "too few samples"
+                elif ratio > 1 + threshold and p_slower < alpha:
+                    status = "regression"
+                elif ratio < 1 / (1 + threshold) and p_faster < alpha:
+                    status = "improvement"
+                else:
+                    status = "ok"
+                comparison.update(
+                    {
+                        "baseline": old["median"],
+                        "median": new["median"],
+                        "ratio": ratio,
+                        "p": p_slower,
+                        "status": status,
+                    }
+                )
+            comparisons.append(comparison)
+
+    return comparisons
+
+
+def report(comparisons: List[Dict[str, object]]):
+
+    print(
+        f"{'workload':<22}{'backend':<22}{'timing':<11}"
+        f"{'baseline (ms)':>15}{'median (ms)':>13}{'ratio':>8}{'p':>9}  status"
+    )
+    for comparison in comparisons:
+        line = (
+            f"{comparison['workload']:<22}{comparison['backend']:<22}"
+            f"{comparison['timing']:<11}"
+        )
+        if "ratio" in comparison:
+            line += (
+                f"{comparison['baseline'] / 1e6:>15.3f}"
+                f"{comparison['median'] / 1e6:>13.3f}"
+                f"{comparison['ratio']:>8.3f}{comparison['p']:>9.4f}"
+            )
+        else:
+            line += " " * 45
+        if "mismatch" in comparison:
+            line += f"  {comparison['status']} of {', '.join(comparison['mismatch'])}"
+            print(line)
+        else:
+            print(f"{line}  {comparison['status']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.gate",
+        description="Benchmark regression gate, exits with 1 on a regression",
+    )
+    group = parser.add_argument_group("Parameters")
+    add_arguments(group)
+    group.add_argument(
+        "-d",
+        "--baselines",
+        required=False,
+        default=os.path.join("benchmarks", "baselines"),
+        type=str,
+        help="The directory of the baseline JSON files, one per workload.",
+    )
+    group.add_argument(
+        "-t",
+        "--threshold",
+        required=False,
+        default=0.1,
+        type=float,
+        help="The relative slowdown of the median that counts as a regression.",
+    )
+    group.add_argument(
+        "-a",
+        "--alpha",
+        required=False,
+        default=0.01,
+        type=float,
+        help="The significance level of the Mann-Whitney U test.",
+    )
+    group.add_argument(
+        "--allow-missing",
+        required=False,
+        action="store_true",
+        help="Pass workloads and backends without a baseline instead of failing.",
+    )
+    group.add_argument(
+        "--allow-environment",
+        required=False,
+        action="store_true",
+        help="Compare against baselines of another machine or library versions.",
+    )
+    group.add_argument(
+        "--update",
+        required=False,
+        action="store_true",
+        help="Store the results as the new baselines instead of comparing.",
+    )
+    arguments = parser.parse_args()
+    return arguments
+
+
+def main(arguments) -> int:
+
+    # With too few timed runs no slowdown can ever be significant at alpha
+    if not arguments.update and minimum_p(arguments.repeat, arguments.repeat) >= (
+        arguments.alpha
+    ):
+        print(
+            f"--repeat {arguments.repeat} cannot reach a p-value below --alpha "
+            f"{arguments.alpha}, use more timed runs",
+            file=sys.stderr,
+        )
+        return 2
+
+    results = run(
+        arguments.backends,
+        arguments.workloads,
+        arguments.repeat,
+        arguments.warmup,
+        arguments.seed,
+        arguments.memory,
+        arguments.budget,
+    )
+
+    if arguments.update:
+        save_baselines(arguments.baselines, results)
+        return 0
+
+    comparisons = compare(
+        arguments.baselines,
+        results,
+        arguments.threshold,
+        arguments.alpha,
+        arguments.allow_environment,
+    )
+    report(comparisons)
+
+    # A missing baseline is usually a wrong path or a new workload, both fail
+    # unless allowed
+    failures = ["regression", "too few samples", "environment mismatch"]
+    if not arguments.allow_missing:
+        failures.append("no baseline")
+    return int(any([c["status"] in failures for c in comparisons]))
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    sys.exit(main(arguments))
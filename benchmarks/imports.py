@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Benchmarking tool for the import time of the HMM modules"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+__author__ = "Elmer Nocon, Abien Fred Agarap"
+
+
+MODULES = [
+    "hmm.hmm_py",
+    "hmm.hmm_py_profile",
+    "hmm.hmm_jhu",
+    "hmm.hmm_jhu_profile",
+    "hmm.hmm_jhu_numba",
+    "hmm.hmm_jhu_profile_numba",
+    "hmm.hmm_aot",
+    "hmm.hmm_decode",
+]
+
+# Run in a fresh interpreter so that nothing is imported beforehand
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "duration": duration,
+    "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": [m for m in ("pandas", "matplotlib", "numba") if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarking HMM import time")
+    group = parser.add_argument_group("Parameters")
+    group.add_argument(
+        "-e",
+        "--executions",
+        required=False,
+        default=5,
+        type=int,
+        help="The number of fresh interpreters per module.",
+    )
+    group.add_argument(
+        "-m",
+        "--modules",
+        required=False,
+        default=MODULES,
+        type=str,
+        nargs="+",
+        help="The modules to import.",
+    )
+    arguments = parser.parse_args()
+    return arguments
+
+
+def main(arguments):
+
+    for module in arguments.modules:
+        results = [measure(module) for _ in range(arguments.executions)]
+        duration = statistics.median([result["duration"] for result in results])
+        max_rss = statistics.median([result["max_rss"] for result in results])
+        print(module)
+        print(
+            f"\tTook {duration * 1000:.1f} ms.\t|\t{max_rss // 1024} MB max RSS"
+            f"\t|\tloaded {results[0]['modules']}"
+        )
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    main(arguments)
@@ -0,0 +1,91 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Peak resident memory and peak Python allocations of a function"""
+import os
+import sys
+import tracemalloc
+
+from typing import Callable, Dict
+
+
+def current_rss() -> int:
+
+    # Bytes, only known on Linux, elsewhere the peak so far stands in
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss() -> int:
+
+    # Bytes, the high-water mark that reset_peak_rss moves down on Linux
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def reset_peak_rss() -> bool:
+
+    # Linux 4.0+ resets the high-water mark to the current RSS, elsewhere the
+    # peak keeps everything that ran before in the process
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure_memory(function: Callable) -> Dict[str, int]:
+
+    # Separate runs, the traces of tracemalloc would add to the RSS
+    reset = reset_peak_rss()
+    rss = current_rss()
+    function()
+    peak = peak_rss()
+
+    # NumPy reports its buffers to tracemalloc, Numba's runtime does not, which
+    # the RSS increase still covers
+    tracemalloc.start()
+    try:
+        function()
+        _, allocated = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "allocated_peak": allocated,
+        "rss_peak": peak,
+        "rss_increase": max(0, peak - rss) if reset else None,
+    }
@@ -0,0 +1,123 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Plots of decoding time and memory against the workload size"""
+import argparse
+import json
+
+from benchmarks.scaling import complexity, series
+
+__author__ = "Elmer Nocon, Abien Fred Agarap"
+
+
+def plot(results: dict, name: str, output: str = None):
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_style("darkgrid")
+    backends = series(results)[name]
+    memory = any(["memory" in r for points in backends.values() for _, r in points])
+    figure, axes = plt.subplots(1, 2 if memory else 1, squeeze=False)
+    axes = axes[0]
+
+    # Label every backend with its fitted exponent when there is one
+    exponents = {
+        fit["backend"]: fit["exponent"]
+        for fit in complexity(results)
+        if fit["series"] == name
+    }
+
+    for backend, points in backends.items():
+        sizes = [size for size, _ in points]
+        label = backend
+        if backend in exponents:
+            label = f"{backend} (size^{exponents[backend]:.2f})"
+        axes[0].errorbar(
+            sizes,
+            [r["decode"]["median"] / 1e6 for _, r in points],
+            yerr=[r["decode"]["iqr"] / 2e6 for _, r in points],
+            label=label,
+        )
+        if memory:
+            axes[1].plot(
+                sizes,
+                [r["memory"]["allocated_peak"] / 2 ** 20 for _, r in points],
+                label=backend,
+            )
+
+    for axis in axes:
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+    axes[0].set_xlabel("Size")
+    axes[0].set_ylabel("Decoding time, median (in ms)")
+    if memory:
+        axes[1].set_xlabel("Size")
+        axes[1].set_ylabel("Peak allocations (in MB)")
+    axes[0].legend(loc="upper left")
+    figure.suptitle(f"HMM Benchmark ({name})")
+
+    if output:
+        figure.savefig(output)
+    else:
+        plt.show()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.plot",
+        description="Plot benchmark results against the workload size",
+    )
+    group = parser.add_argument_group("Parameters")
+    group.add_argument(
+        "results",
+        type=str,
+        help="The JSON file written by python -m benchmarks --output.",
+    )
+    group.add_argument(
+        "-n",
+        "--name",
+        required=False,
+        default="casino",
+        type=str,
+        help="The workload series to plot, e.g. casino, profile or states.",
+    )
+    group.add_argument(
+        "-o",
+        "--output",
+        required=False,
+        type=str,
+        help="Save the figure to a file instead of showing it.",
+    )
+    arguments = parser.parse_args()
+    return arguments
+
+
+def main(arguments):
+
+    with open(arguments.results) as file:
+        results = json.load(file)
+    plot(results, arguments.name, arguments.output)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    main(arguments)
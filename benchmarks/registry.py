@@ -0,0 +1,202 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Registry of the backends and workloads of the benchmark suite"""
+import random
+
+from functools import partial
+from typing import Callable, Dict, List
+
+from hmm.hmm_decode import Backend, random_model
+from hmm.hmm_sample import create_hmm_cpg_islands, create_profile_hmm
+
+# Dishonest casino with a fair and a loaded coin
+CASINO = (
+    {"F-F": 0.6, "F-L": 0.4, "L-F": 0.4, "L-L": 0.6},  # Transition matrix
+    {"F-H": 0.5, "F-T": 0.5, "L-H": 0.8, "L-T": 0.2},  # Emission matrix
+    {"F": 0.5, "L": 0.5},  # Initial probabilities
+)
+
+
+class Workload(object):
+    def __init__(
+        self,
+        name: str,
+        family: str,
+        build: Callable,
+        alphabet: str,
+        length: int,
+        count: int = 1,
+        batch: bool = False,
+        default: bool = True,
+    ):
+        self.name, self.family, self.build = name, family, build
+        self.alphabet, self.length, self.count = alphabet, length, count
+        self.batch, self.default = batch, default
+
+    @property
+    def series(self) -> str:
+
+        # Workloads are named <series>-<size>, e.g. casino-1000 or states-512
+        return self.name.rsplit("-", 1)[0]
+
+    @property
+    def size(self) -> int:
+        return int(self.name.rsplit("-", 1)[1])
+
+    def sequences(self, seed: int) -> List[str]:
+
+        # The same sequences for every backend and every run with the same seed
+        rd = random.Random(f"{self.name}-{seed}")
+        return [
+            "".join([rd.choice(self.alphabet) for _ in range(self.length)])
+            for _ in range(self.count)
+        ]
+
+    def decode(self, hmm, sequences: List[str], method: str = None):
+        if method is None and self.batch and hasattr(hmm, "viterbi_batch_log"):
+            return hmm.viterbi_batch_log(sequences)
+        decode = getattr(hmm, method or "viterbi_log")
+        return [decode(x) for x in sequences]
+
+
+BACKENDS: Dict[str, Backend] = {}
+WORKLOADS: Dict[str, Workload] = {}
+
+
+def register_backend(backend: Backend) -> Backend:
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def register_workload(workload: Workload) -> Workload:
+    WORKLOADS[workload.name] = workload
+    return workload
+
+
+def select_workloads(names: List[str]) -> List[str]:
+
+    # Names of workloads or of whole series, in the order of registration
+    selected = []
+    for name in names:
+        if name in WORKLOADS:
+            selected.append(name)
+            continue
+        matches = [w.name for w in WORKLOADS.values() if w.series == name]
+        if not matches:
+            raise ValueError(f"Unknown workload {name!r}")
+        selected.extend(matches)
+    return selected
+
+
+def build_casino(cls):
+    return cls(*CASINO)
+
+
+def build_random(cls, n_states: int, n_symbols: int, density: float):
+    return cls.from_arrays(*random_model(n_states, n_symbols, density))
+
+
+def register_random(name: str, n_states: int, n_symbols: int, density: float):
+    register_workload(
+        Workload(
+            name,
+            "hmm",
+            partial(
+                build_random, n_states=n_states, n_symbols=n_symbols, density=density
+            ),
+            "".join([chr(0x21 + i) for i in range(n_symbols)]),
+            100,
+            default=False,
+        )
+    )
+
+
+for name, module, cls in [
+    ("py", "hmm.hmm_py", "HMM"),
+    ("py_numba", "hmm.hmm_py_numba", "HMMNumba"),
+    ("numpy", "hmm.hmm_jhu", "HMM"),
+    ("numpy_numba", "hmm.hmm_jhu_numba", "HMMNumba"),
+    ("aot", "hmm.hmm_aot", "HMMAot"),
+]:
+    register_backend(Backend(name, module, cls, "hmm"))
+
+# Predecessor lists in CSR form, the cost follows the nonzero transitions
+# rather than the square of the number of states
+for name, module, cls in [
+    ("numpy_sparse", "hmm.hmm_jhu", "HMM"),
+    ("numpy_numba_sparse", "hmm.hmm_jhu_numba", "HMMNumba"),
+]:
+    register_backend(Backend(name, module, cls, "hmm", "viterbi_log_sparse"))
+
+for name, module, cls in [
+    ("profile_py", "hmm.hmm_py_profile", "HMM"),
+    ("profile_py_numba", "hmm.hmm_py_profile_numba", "HMMNumba"),
+    ("profile_numpy", "hmm.hmm_jhu_profile", "HMM"),
+    ("profile_numpy_numba", "hmm.hmm_jhu_profile_numba", "HMMNumba"),
+    ("profile_plan7", "hmm.hmm_plan7", "ProfileHMM"),
+]:
+    register_backend(Backend(name, module, cls, "profile"))
+
+for length in (100, 1000, 10000):
+    register_workload(Workload(f"casino-{length}", "hmm", build_casino, "HT", length))
+
+for length in (1000, 10000):
+    register_workload(
+        Workload(f"cpg-{length}", "hmm", create_hmm_cpg_islands, "acgt", length)
+    )
+
+for count in (16, 256):
+    register_workload(
+        Workload(
+            f"cpg-batch-{count}",
+            "hmm",
+            create_hmm_cpg_islands,
+            "acgt",
+            200,
+            count=count,
+            batch=True,
+        )
+    )
+
+# Profiles of 5 * size nodes decoding a sequence about as long as the profile
+for size in (1, 5, 20):
+    register_workload(
+        Workload(
+            f"profile-{size}",
+            "profile",
+            partial(create_profile_hmm, size=size),
+            "acgt",
+            size * 5,
+        )
+    )
+
+# Sweeps of one dimension of random models with the others fixed, only run
+# when selected by series name or workload name
+for n_states in (2, 8, 32, 128, 512, 2048, 5000):
+    register_random(f"states-{n_states}", n_states, 4, 1.0)
+    register_random(f"sparse-states-{n_states}", n_states, 4, min(1.0, 4 / n_states))
+
+for n_symbols in (2, 4, 16, 64):
+    register_random(f"alphabet-{n_symbols}", 64, n_symbols, 1.0)
+
+for percent in (1, 5, 25, 100):
+    register_random(f"density-{percent}", 512, 4, percent / 100)
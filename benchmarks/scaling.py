@@ -0,0 +1,81 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Scaling of the decoding time along a series of workloads"""
+import math
+
+from typing import Dict, List, Tuple
+
+
+def series(results: dict) -> Dict[str, Dict[str, List[Tuple[int, dict]]]]:
+
+    # Workloads are named <series>-<size>, e.g. casino-1000 or states-512
+    lines = {}
+    for result in results["results"]:
+        if "decode" not in result:
+            continue
+        name, size = result["workload"].rsplit("-", 1)
+        backends = lines.setdefault(name, {})
+        backends.setdefault(result["backend"], []).append((int(size), result))
+
+    for backends in lines.values():
+        for points in backends.values():
+            points.sort(key=lambda point: point[0])
+    return lines
+
+
+def fit_exponent(sizes: List[float], durations: List[float]) -> Tuple[float, float]:
+
+    # Least squares line through log(duration) = log(c) + k * log(size), the
+    # slope k is the exponent of the size, and R^2 how well a power law fits
+    x = [math.log(size) for size in sizes]
+    y = [math.log(duration) for duration in durations]
+    mx, my = sum(x) / len(x), sum(y) / len(y)
+    sxx = sum([(a - mx) ** 2 for a in x])
+    sxy = sum([(a - mx) * (b - my) for a, b in zip(x, y)])
+    syy = sum([(b - my) ** 2 for b in y])
+    k = sxy / sxx
+    r2 = 1.0 if syy == 0 else sxy * sxy / (sxx * syy)
+    return k, r2
+
+
+def complexity(results: dict, minimum: int = 3) -> List[Dict[str, object]]:
+
+    # One fit per series and backend with enough distinct sizes
+    fits = []
+    for name, backends in series(results).items():
+        for backend, points in backends.items():
+            if len(set([size for size, _ in points])) < minimum:
+                continue
+            exponent, r2 = fit_exponent(
+                [size for size, _ in points],
+                [r["decode"]["median"] for _, r in points],
+            )
+            fits.append(
+                {
+                    "series": name,
+                    "backend": backend,
+                    "exponent": exponent,
+                    "r2": r2,
+                    "sizes": [size for size, _ in points],
+                }
+            )
+    return fits
@@ -0,0 +1,168 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Runs the backends over the workloads and collects the timings"""
+from typing import Dict, List
+
+from benchmarks.memory import measure_memory
+from benchmarks.registry import BACKENDS, WORKLOADS, select_workloads
+from benchmarks.scaling import complexity
+from benchmarks.timing import measure, summarize
+from hmm.hmm_decode import environment
+
+SEED = 42
+
+# Workloads run when none are selected, the sweeps only run on request
+DEFAULT_WORKLOADS = [name for name, w in WORKLOADS.items() if w.default]
+
+
+def run(
+    backends: List[str] = None,
+    workloads: List[str] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    seed: int = SEED,
+    memory: bool = False,
+    budget: float = None,
+) -> Dict[str, object]:
+
+    backends = backends or list(BACKENDS)
+    workloads = select_workloads(workloads or DEFAULT_WORKLOADS)
+
+    # Series and backends whose decoding took longer than the budget in seconds
+    exceeded = set()
+
+    results = []
+    for workload in map(WORKLOADS.get, workloads):
+        sequences = workload.sequences(seed)
+        for backend in map(BACKENDS.get, backends):
+            if backend.family != workload.family:
+                continue
+            result = {"backend": backend.name, "workload": workload.name}
+
+            # Larger sizes of a series are skipped once a backend is over budget
+            if (workload.series, backend.name) in exceeded:
+                result["skipped"] = f"over the budget of {budget} s"
+                results.append(result)
+                continue
+
+            # Construction and decoding are timed separately, a backend that
+            # cannot be loaded or fails is reported instead of stopping the suite
+            try:
+                cls = backend.load()
+                construct = measure(lambda: workload.build(cls), repeat, warmup)
+                hmm = workload.build(cls)
+                decode = measure(
+                    lambda: workload.decode(hmm, sequences, backend.method),
+                    repeat,
+                    warmup,
+                )
+
+                # Memory of decoding only, after the timed runs
+                if memory:
+                    result["memory"] = measure_memory(
+                        lambda: workload.decode(hmm, sequences, backend.method)
+                    )
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {str(e).strip()}"
+            else:
+                result["construct"] = summarize(construct)
+                result["decode"] = summarize(decode)
+                if budget is not None and result["decode"]["median"] > budget * 1e9:
+                    exceeded.add((workload.series, backend.name))
+            results.append(result)
+
+    return {
+        "environment": environment(),
+        "config": {
+            "repeat": repeat,
+            "warmup": warmup,
+            "seed": seed,
+            "memory": memory,
+            "budget": budget,
+        },
+        "results": results,
+        "complexity": complexity({"results": results}),
+    }
+
+
+def add_arguments(group):
+    group.add_argument(
+        "-b",
+        "--backends",
+        required=False,
+        default=list(BACKENDS),
+        choices=list(BACKENDS),
+        type=str,
+        nargs="+",
+        metavar="BACKEND",
+        help=f"The backends to run on the workloads of their model family, of "
+        f"{', '.join(BACKENDS)}.",
+    )
+    group.add_argument(
+        "-w",
+        "--workloads",
+        required=False,
+        default=DEFAULT_WORKLOADS,
+        type=str,
+        nargs="+",
+        metavar="WORKLOAD",
+        help=f"The workloads or series of workloads to run, of "
+        f"{', '.join(WORKLOADS)}. The default is {', '.join(DEFAULT_WORKLOADS)}.",
+    )
+    group.add_argument(
+        "-r",
+        "--repeat",
+        required=False,
+        default=5,
+        type=int,
+        help="The number of timed runs per backend and workload.",
+    )
+    group.add_argument(
+        "-u",
+        "--warmup",
+        required=False,
+        default=1,
+        type=int,
+        help="The number of untimed runs before the timed ones.",
+    )
+    group.add_argument(
+        "-s",
+        "--seed",
+        required=False,
+        default=SEED,
+        type=int,
+        help="The seed of the generated sequences.",
+    )
+    group.add_argument(
+        "-m",
+        "--memory",
+        required=False,
+        action="store_true",
+        help="Also record the peak RSS and the peak allocations of decoding.",
+    )
+    group.add_argument(
+        "--budget",
+        required=False,
+        type=float,
+        help="Skip the larger sizes of a series for a backend once its decoding "
+        "takes longer than this many seconds.",
+    )
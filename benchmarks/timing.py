@@ -0,0 +1,67 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Repeated timing of a function and robust summaries of the samples"""
+import gc
+import statistics
+import time
+
+from typing import Callable, Dict, List
+
+
+def measure(function: Callable, repeat: int = 5, warmup: int = 1) -> List[int]:
+
+    for _ in range(warmup):
+        function()
+
+    # Collections would land on whichever run happens to trigger them
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            function()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if enabled:
+            gc.enable()
+
+    return samples
+
+
+def summarize(samples: List[int]) -> Dict[str, object]:
+
+    # Nanoseconds, the median and interquartile range are robust to outliers
+    if len(samples) > 1:
+        q1, median, q3 = statistics.quantiles(samples, n=4)
+    else:
+        q1 = median = q3 = samples[0]
+
+    return {
+        "median": median,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": min(samples),
+        "max": max(samples),
+        "samples": list(samples),
+    }
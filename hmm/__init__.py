@@ -0,0 +1 @@
+from hmm.hmm_decode import BACKENDS, Backend, decode, register_backend
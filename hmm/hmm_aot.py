@@ -0,0 +1,173 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Hidden Markov Model using the Numba kernels compiled ahead of time"""
+import argparse
+import importlib
+import os
+
+import numpy as np
+
+from typing import List, Tuple
+
+from hmm.hmm_jhu import HMM
+
+# Name of the extension module, built next to this file by default
+MODULE = "hmm_kernels"
+
+# Exported kernels and their signatures, the traceback is fixed to uint32
+MATRICES = "f8[:, ::1], f8[:, ::1], f8[::1]"
+SIGNATURES = {
+    "viterbi_batch": f"Tuple((f8[::1], u4[:, ::1]))({MATRICES}, i8[:, ::1])",
+    "viterbi_batch_log": f"Tuple((f8[::1], u4[:, ::1]))({MATRICES}, i8[:, ::1])",
+    "viterbi_ragged_log": f"Tuple((f8[::1], i8[::1]))({MATRICES}, i8[::1], i8[::1])",
+}
+
+
+def build(output_dir: str = None) -> str:
+
+    # Numba is only needed to build the module, not to load it
+    from numba.pycc import CC
+    from hmm.hmm_jhu_numba import HMMNumba
+
+    batch = HMMNumba.calculate_viterbi_batch
+    batch_log = HMMNumba.calculate_viterbi_batch_log
+    ragged_log = HMMNumba.calculate_viterbi_ragged_log_nogil
+
+    def viterbi_batch(A, E, I, x):
+        return batch(A, E, I, x, np.uint32)
+
+    def viterbi_batch_log(A, E, I, x):
+        return batch_log(A, E, I, x, np.uint32)
+
+    def viterbi_ragged_log(A, E, I, x, offsets):
+        return ragged_log(A, E, I, x, offsets, np.uint32)
+
+    cc = CC(MODULE)
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    for function in (viterbi_batch, viterbi_batch_log, viterbi_ragged_log):
+        cc.export(function.__name__, SIGNATURES[function.__name__])(function)
+    cc.compile()
+
+    return cc.output_dir
+
+
+def load():
+    try:
+        return importlib.import_module(f"hmm.{MODULE}")
+    except ImportError:
+        raise ImportError(
+            f"hmm.{MODULE} is not built, run python -m hmm.hmm_aot first"
+        ) from None
+
+
+def matrices(transition_matrix, emission_matrix, initial_probabilities):
+
+    # The compiled signatures are exact, other types or layouts would be misread
+    return (
+        np.ascontiguousarray(transition_matrix, dtype=np.float64),
+        np.ascontiguousarray(emission_matrix, dtype=np.float64),
+        np.ascontiguousarray(initial_probabilities, dtype=np.float64),
+    )
+
+
+class HMMAot(HMM):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.kernels = load()
+
+    @classmethod
+    def from_arrays(cls, *args, **kwargs):
+        hmm = super().from_arrays(*args, **kwargs)
+        hmm.kernels = load()
+        return hmm
+
+    def batch_kernel(self, name: str):
+        kernel = getattr(self.kernels, name)
+
+        def call(transition_matrix, emission_matrix, initial_probabilities, x):
+            return kernel(
+                *matrices(transition_matrix, emission_matrix, initial_probabilities),
+                np.ascontiguousarray(x, dtype=np.int64),
+            )
+
+        return call
+
+    def viterbi(self, x: str) -> Tuple[float, str]:
+        return self.viterbi_batch([x])[0]
+
+    def viterbi_log(self, x: str) -> Tuple[float, str]:
+        return self.viterbi_ragged_log([x])[0]
+
+    def viterbi_batch(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            self.batch_kernel("viterbi_batch"),
+            self.A,
+            self.E,
+            self.I,
+            sequences,
+            batch_size,
+        )
+
+    def viterbi_batch_log(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            self.batch_kernel("viterbi_batch_log"),
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            sequences,
+            batch_size,
+        )
+
+    def viterbi_ragged_log(self, sequences: List[str]) -> List[Tuple[float, str]]:
+        kernel = self.kernels.viterbi_ragged_log
+
+        def call(transition_matrix, emission_matrix, initial_probabilities, x, offsets):
+            return kernel(
+                *matrices(transition_matrix, emission_matrix, initial_probabilities),
+                np.ascontiguousarray(x, dtype=np.int64),
+                offsets,
+            )
+
+        return self.decode_ragged(call, self.A_log, self.E_log, self.I_log, sequences)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile the Numba kernels")
+    group = parser.add_argument_group("Parameters")
+    group.add_argument(
+        "-o",
+        "--output_dir",
+        required=False,
+        type=str,
+        help="Directory of the extension module, defaults to the hmm package.",
+    )
+    arguments = parser.parse_args()
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    print(build(arguments.output_dir))
@@ -0,0 +1,303 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Decoding through a registry of backends, with automatic backend selection"""
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import warnings
+import weakref
+
+from functools import lru_cache
+from importlib import metadata
+from typing import Dict, List, Tuple
+
+# Default location of the calibration data, one file per machine and user
+CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache"),
+    "hmm-viterbi",
+    "calibration.json",
+)
+
+# Model shapes of the calibration, as numbers of states and sequence lengths
+CALIBRATION_STATES = [2, 16, 64]
+CALIBRATION_LENGTHS = [32, 256]
+
+
+class Backend(object):
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        cls: str,
+        family: str = "hmm",
+        method: str = None,
+        numba: bool = False,
+    ):
+        self.name, self.module, self.cls, self.family = name, module, cls, family
+
+        # Decoding method of the model, viterbi_log by default
+        self.method, self.numba = method, numba
+
+    @property
+    def available(self) -> bool:
+        return not self.numba or importlib.util.find_spec("numba") is not None
+
+    def load(self):
+
+        # Imported on first use, Numba kernels are compiled or loaded here as well
+        cls = getattr(importlib.import_module(self.module), self.cls)
+        if hasattr(cls, "warm_up"):
+            cls.warm_up()
+        return cls
+
+
+BACKENDS: Dict[str, Backend] = {}
+
+# Classes of the loaded backends and the models converted to them
+LOADED: Dict[str, type] = {}
+CONVERTED = weakref.WeakKeyDictionary()
+
+# Calibration data of every cache file read or written, by path
+CALIBRATIONS: Dict[str, dict] = {}
+
+
+def register_backend(backend: Backend) -> Backend:
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+register_backend(Backend("py", "hmm.hmm_py", "HMM"))
+register_backend(Backend("py_numba", "hmm.hmm_py_numba", "HMMNumba", numba=True))
+register_backend(Backend("numpy", "hmm.hmm_jhu", "HMM"))
+register_backend(Backend("numpy_numba", "hmm.hmm_jhu_numba", "HMMNumba", numba=True))
+
+
+def load_backend(name: str) -> type:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, of {', '.join(BACKENDS)}")
+    if name not in LOADED:
+        LOADED[name] = BACKENDS[name].load()
+    return LOADED[name]
+
+
+def check_model(model):
+
+    # Only models of a registered backend, or of a subclass such as HMMAot, are
+    # converted, profile and Plan7 models would lose their deletion states.
+    # Compared by name so checking does not import the backends
+    names = {f"{backend.module}.{backend.cls}" for backend in BACKENDS.values()}
+    classes = [f"{c.__module__}.{c.__qualname__}" for c in type(model).__mro__]
+    if not names.intersection(classes):
+        raise TypeError(f"No registered backend decodes {classes[0]} models")
+
+
+def convert(model, name: str):
+
+    # Models of another backend are copied once, with their log matrices so
+    # the scores stay the same, and kept for as long as the model lives
+    check_model(model)
+    cls = load_backend(name)
+    if type(model) is cls:
+        return model
+    converted = CONVERTED.setdefault(model, {})
+    if name not in converted:
+        converted[name] = cls.from_arrays(
+            model.Q,
+            model.S,
+            model.A,
+            model.E,
+            model.I,
+            model.A_log,
+            model.E_log,
+            model.I_log,
+        )
+    return converted[name]
+
+
+def environment() -> dict:
+
+    # Timings are only compared on the same hardware and library versions, the
+    # host name is left out so containers and CI runners of one kind match.
+    # Versions are read from the package metadata so Numba is not imported
+    versions = {}
+    for package in ("numpy", "numba"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        **versions,
+    }
+
+
+@lru_cache(maxsize=1)
+def random_model(n_states: int, n_symbols: int, density: float = 1.0, seed: int = 42):
+    import numpy as np
+
+    # Rows of A with a random subset of density * n_states nonzero transitions,
+    # the weights of the rows of A, E and I are Dirichlet distributed
+    rng = np.random.default_rng(seed)
+    k = max(1, int(round(density * n_states)))
+    A = np.zeros(shape=(n_states, n_states), dtype=np.float64)
+    for i in range(n_states):
+        A[i, rng.choice(n_states, size=k, replace=False)] = rng.dirichlet(np.ones(k))
+    E = rng.dirichlet(np.ones(n_symbols), size=n_states)
+    I = rng.dirichlet(np.ones(n_states))
+
+    # Single characters, so paths and sequences stay plain strings
+    states = [chr(0x100 + i) for i in range(n_states)]
+    symbols = [chr(0x21 + i) for i in range(n_symbols)]
+    return states, symbols, A, E, I
+
+
+def features(n_states: int, length: int) -> List[float]:
+
+    # Decoding costs a call, a step per column and a transition per column and
+    # pair of states
+    return [1.0, float(length), float(length * n_states * n_states)]
+
+
+def fit_costs(samples: List[Tuple[int, int, float]]) -> List[float]:
+    import numpy as np
+
+    # Least squares on the relative error so the small shapes count as much as
+    # the large ones, a negative coefficient is no better than none
+    X = np.array([features(n, length) for n, length, _ in samples])
+    y = np.array([duration for _, _, duration in samples])
+    coefficients = np.linalg.lstsq(X / y[:, None], np.ones(len(y)), rcond=None)[0]
+    return [max(0.0, float(c)) for c in coefficients]
+
+
+def measure(name: str, repeat: int = 3, budget: float = 0.1) -> List[float]:
+    from hmm.hmm_jhu import HMM
+
+    # Shapes from the cheapest to the most expensive, a slow backend stops once
+    # a decoding takes longer than the budget
+    shapes = sorted(
+        [(n, length) for n in CALIBRATION_STATES for length in CALIBRATION_LENGTHS],
+        key=lambda shape: features(*shape)[2],
+    )
+    samples = []
+    for n, length in shapes:
+        model = convert(HMM.from_arrays(*random_model(n, 4)), name)
+        x = "".join(random.Random(length).choice(model.S) for _ in range(length))
+        decode = getattr(model, BACKENDS[name].method or "viterbi_log")
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            decode(x)
+            durations.append(time.perf_counter() - start)
+        samples.append((n, length, statistics.median(durations)))
+        if min(durations) > budget:
+            break
+
+    return fit_costs(samples)
+
+
+def calibrate(names: List[str] = None) -> dict:
+
+    # Cost coefficients of every backend that can be loaded, the others are
+    # recorded with the reason they are not used
+    costs, errors = {}, {}
+    for name in names or BACKENDS:
+        if not BACKENDS[name].available:
+            errors[name] = "Numba is not installed"
+            continue
+        try:
+            costs[name] = measure(name)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}".strip().splitlines()[0]
+    return {"environment": environment(), "costs": costs, "errors": errors}
+
+
+def calibration(path: str = CACHE, refresh: bool = False) -> dict:
+
+    # Read once per process, measured again when the machine, the libraries or
+    # the registered backends changed
+    path = os.path.expanduser(path)
+    if not refresh and path in CALIBRATIONS:
+        return CALIBRATIONS[path]
+
+    data = None
+    if not refresh and os.path.exists(path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+    if data is not None and data.get("environment") != environment():
+        data = None
+
+    missing = [
+        name
+        for name in BACKENDS
+        if data is None or (name not in data["costs"] and name not in data["errors"])
+    ]
+    if missing:
+        update = calibrate(missing)
+        if data is not None:
+            update["costs"] = {**data["costs"], **update["costs"]}
+            update["errors"] = {**data["errors"], **update["errors"]}
+        data = update
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            warnings.warn(f"Calibration not saved to {path}: {e}", RuntimeWarning)
+
+    CALIBRATIONS[path] = data
+    return data
+
+
+def select_backend(n_states: int, length: int, costs: Dict[str, List[float]]) -> str:
+
+    # The backend with the lowest predicted time for the shape
+    available = [name for name in costs if BACKENDS[name].available]
+    if not available:
+        raise ValueError("No calibrated backend is available")
+    x = features(n_states, length)
+    return min(available, key=lambda name: sum(c * v for c, v in zip(costs[name], x)))
+
+
+def decode(model, x: str, backend: str = "auto", log: bool = True) -> Tuple[float, str]:
+
+    # Viterbi path of x with the model converted to the backend, "auto" picks
+    # the backend predicted to be fastest for the number of states and length
+    check_model(model)
+    if backend == "auto":
+        costs = calibration()["costs"]
+        backend = select_backend(model.q_len, len(x), costs)
+    model = convert(model, backend)
+    if not log:
+        return model.viterbi(x)
+    return getattr(model, BACKENDS[backend].method or "viterbi_log")(x)
@@ -0,0 +1,106 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Binary model format with memory-mapped loading"""
+import json
+import struct
+
+import numpy as np
+
+from hmm.hmm_jhu import HMM
+
+# File layout
+# - Header: magic, format version and metadata length as "<4sII"
+# - Metadata: UTF-8 JSON with the states, symbols, dtype and array layout
+# - Data: A, E, I, A_log, E_log and I_log, each starting on an ALIGNMENT boundary
+MAGIC = b"HMMV"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+ALIGNMENT = 64
+ARRAYS = ["A", "E", "I", "A_log", "E_log", "I_log"]
+
+
+def align(n: int) -> int:
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def save_model(hmm, path: str, dtype=np.float64):
+
+    arrays = [np.ascontiguousarray(getattr(hmm, name), dtype=dtype) for name in ARRAYS]
+
+    # Offsets are relative to the start of the data section
+    layout, offset = {}, 0
+    for name, array in zip(ARRAYS, arrays):
+        layout[name] = {"offset": offset, "shape": list(array.shape)}
+        offset = align(offset + array.nbytes)
+
+    metadata = json.dumps(
+        {
+            "states": list(hmm.Q),
+            "symbols": list(hmm.S),
+            "dtype": np.dtype(dtype).newbyteorder("<").str,
+            "arrays": layout,
+        }
+    ).encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(metadata)))
+        file.write(metadata)
+        start = align(HEADER.size + len(metadata))
+        for name, array in zip(ARRAYS, arrays):
+            file.seek(start + layout[name]["offset"])
+            file.write(array.astype(np.dtype(dtype).newbyteorder("<")).tobytes())
+
+
+def load_model(path: str, cls=HMM, mmap: bool = True):
+
+    with open(path, "rb") as file:
+        magic, version, length = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported model file version {version}")
+        metadata = json.loads(file.read(length).decode("utf-8"))
+
+    # Map every array read-only, pages are shared by all processes loading the file
+    start, dtype = align(HEADER.size + length), np.dtype(metadata["dtype"])
+    arrays = []
+    for name in ARRAYS:
+        layout = metadata["arrays"][name]
+        shape = tuple(layout["shape"])
+        if mmap:
+            array = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=start + layout["offset"],
+                shape=shape,
+            )
+        else:
+            array = np.fromfile(
+                path,
+                dtype=dtype,
+                count=int(np.prod(shape)),
+                offset=start + layout["offset"],
+            ).reshape(shape)
+        arrays.append(array)
+
+    return cls.from_arrays(metadata["states"], metadata["symbols"], *arrays)
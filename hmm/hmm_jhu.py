@@ -22,15 +22,179 @@
 """Hidden Markov Model using NumPy"""
 import math
 import numpy as np
-import pandas as pd
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
+
+# Upper bound on the number of cells in a batched trellis column
+BATCH_CELLS = 1 << 22
+
+# Largest number of nonzero probabilities whose log2 matches math.log2 exactly
+LOG2_EXACT_VALUES = 1 << 16
 
 
 def log2(x):
     return -10000 if x == 0 else math.log2(x)
 
 
+def log2_array(x, x_log=None) -> np.ndarray:
+
+    if x_log is not None:
+        return np.asarray(x_log, dtype=np.float64)
+
+    # math.log2 of every distinct nonzero value keeps the scores identical to
+    # the pure Python backends, np.log2 can differ in the last place. Large
+    # dense models have nearly as many distinct values as entries, there the
+    # sort and the Python loop would dominate construction
+    x = np.asarray(x, dtype=np.float64)
+    x_log = np.full(shape=x.shape, fill_value=log2(0), dtype=np.float64)
+    nonzero = x != 0
+    values = x[nonzero]
+    if len(values) > LOG2_EXACT_VALUES:
+        x_log[nonzero] = np.log2(values)
+    else:
+        values, inverse = np.unique(values, return_inverse=True)
+        x_log[nonzero] = np.array([log2(v) for v in values])[inverse.reshape(-1)]
+    return x_log
+
+
+def logsumexp2(x: np.ndarray, axis: int) -> np.ndarray:
+
+    # log2 of the sum of 2 ** x, shifted by the maximum so nothing underflows
+    mx = x.max(axis=axis, keepdims=True)
+    return (mx + np.log2(np.exp2(x - mx).sum(axis=axis, keepdims=True))).squeeze(axis)
+
+
+def parse_model(
+    transition_matrix: Dict[str, float],
+    emission_matrix: Dict[str, float],
+    initial_probabilities: Dict[str, float],
+) -> Tuple[List[str], List[str], np.ndarray, np.ndarray, np.ndarray]:
+
+    # Split the "source-destination" and "state-symbol" keys
+    transitions = [transition.split("-") for transition in transition_matrix]
+    emissions = [emission.split("-") for emission in emission_matrix]
+    n_transitions = len(transitions)
+
+    # Sorted state labels and symbols, and the identifier of every occurrence
+    labels = [q for transition in transitions for q in transition]
+    labels += [state for state, symbol in emissions]
+    states, state_ids = np.unique(np.array(labels, dtype=str), return_inverse=True)
+    symbols, symbol_ids = np.unique(
+        np.array([symbol for state, symbol in emissions], dtype=str),
+        return_inverse=True,
+    )
+    states, symbols = states.tolist(), symbols.tolist()
+    state_ids, symbol_ids = state_ids.reshape(-1), symbol_ids.reshape(-1)
+    q_map = {q: i for i, q in enumerate(states)}
+
+    # Populate the matrices with one scatter each
+    A = np.zeros(shape=(len(states), len(states)), dtype=np.float64)
+    A[state_ids[0 : 2 * n_transitions : 2], state_ids[1 : 2 * n_transitions : 2]] = (
+        list(transition_matrix.values())
+    )
+
+    E = np.zeros(shape=(len(states), len(symbols)), dtype=np.float64)
+    E[state_ids[2 * n_transitions :], symbol_ids] = list(emission_matrix.values())
+
+    I = np.zeros(shape=len(states), dtype=np.float64)
+    I[[q_map[q] for q in initial_probabilities]] = list(initial_probabilities.values())
+
+    return states, symbols, A, E, I
+
+
+def traceback_dtype(n_states: int):
+
+    # Smallest unsigned integer type that can hold every state index
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_states <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+def transition_predecessors(transition_matrix) -> Tuple[np.ndarray, np.ndarray]:
+
+    # Column-major scan of the nonzero entries, sorted by destination then source
+    destinations, sources = np.nonzero(transition_matrix.T)
+    counts = np.bincount(destinations, minlength=transition_matrix.shape[1])
+    pointers = np.zeros(shape=len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=pointers[1:])
+    return pointers, sources.astype(np.int64)
+
+
+def symbol_table(symbols: List[str]):
+
+    # Byte value to symbol identifier, only possible when every symbol is one byte
+    if not all(len(s) == 1 and ord(s) < 256 for s in symbols):
+        return None
+
+    # The largest value of the type marks bytes that are not symbols
+    dtype = np.uint8 if len(symbols) < 255 else np.uint16
+    table = np.full(shape=256, fill_value=np.iinfo(dtype).max, dtype=dtype)
+    for i, s in enumerate(symbols):
+        table[ord(s)] = i
+    return table
+
+
+def encode_symbols(
+    table, symbol_map: Dict[str, int], x: Union[str, bytes, np.ndarray]
+) -> np.ndarray:
+
+    # Already encoded
+    if isinstance(x, np.ndarray):
+        return x
+
+    # Single-byte symbols are converted with one gather through the lookup table
+    if table is not None:
+        if isinstance(x, str):
+            try:
+                x = x.encode("latin-1")
+            except UnicodeEncodeError as e:
+                raise ValueError(f"Unknown symbol {x[e.start]!r}") from None
+        codes = table[np.frombuffer(x, dtype=np.uint8)]
+        unknown = codes == np.iinfo(codes.dtype).max
+        if unknown.any():
+            raise ValueError(f"Unknown symbol {chr(x[unknown.argmax()])!r}")
+        return codes
+
+    try:
+        return np.array([symbol_map[s] for s in x], dtype=np.int64)
+    except KeyError as e:
+        raise ValueError(f"Unknown symbol {e.args[0]!r}") from None
+
+
+def check_beam(beam_width: int = None, threshold: float = None):
+
+    # An empty beam has no path, and without either bound decoding is exact
+    if beam_width is None and threshold is None:
+        raise ValueError("Set beam_width, threshold or both")
+    if beam_width is not None and beam_width < 1:
+        raise ValueError(f"beam_width must be at least 1, not {beam_width}")
+    if threshold is not None and not threshold >= 0:
+        raise ValueError(f"threshold must be at least 0, not {threshold}")
+
+
+def prune_beam(scores: np.ndarray, beam_width: int = None, threshold: float = None):
+
+    # States within threshold of the best score, then at most beam_width of them
+    active = np.arange(len(scores))
+    if threshold is not None:
+        active = active[scores >= scores.max() - threshold]
+    if beam_width is not None and len(active) > beam_width:
+        top = np.argpartition(-scores[active], beam_width - 1)[:beam_width]
+        active = np.sort(active[top])
+    return active
+
+
+def build_path(states: List[str], p) -> str:
+
+    # Single-character labels can be gathered as code points without a Python loop
+    if all(len(q) == 1 for q in states):
+        labels = np.array([ord(q) for q in states], dtype=np.uint32)
+        return labels[p].tobytes().decode("utf-32-le")
+
+    return "".join([states[q] for q in p])
+
+
 class HMM(object):
     def __init__(
         self,
@@ -39,72 +203,94 @@ class HMM(object):
         initial_probabilities: Dict[str, float],
     ):
 
-        # Initialize states and symbols
-        self.Q, self.S = set(), set()
+        states, symbols, A, E, I = parse_model(
+            transition_matrix, emission_matrix, initial_probabilities
+        )
 
-        # Add state labels to the set self.Q
-        for transition, probability in transition_matrix.items():
-            source, destination = transition.split("-")
-            self.Q.add(source)
-            self.Q.add(destination)
+        # Make A stochastic (i.e. make rows add to 1)
+        a_sums = A.sum(axis=1, keepdims=1)
+        a_sums[a_sums == 0] = 1
+        A /= a_sums
 
-        # Add symbols to the set self.S
-        for emission, probability in emission_matrix.items():
-            state, symbol = emission.split("-")
-            self.Q.add(state)
-            self.S.add(symbol)
+        # Make E stochastic (i.e. make rows add to 1)
+        e_sums = E.sum(axis=1, keepdims=1)
+        e_sums[e_sums == 0] = 1
+        E /= e_sums
 
-        # Sort the sets self.Q and self.S
-        self.Q = sorted(list(self.Q))
-        self.S = sorted(list(self.S))
-        self.q_len, self.s_len = len(self.Q), len(self.S)
+        # Make I stochastic (i.e. adds to 1)
+        I = np.divide(I, sum(I))
 
-        # Create maps from states and symbols to integers that functions as unique identifiers
-        self.q_map, self.s_map = {}, {}
-        for i in range(len(self.Q)):
-            self.q_map[self.Q[i]] = i
-        for i in range(len(self.S)):
-            self.s_map[self.S[i]] = i
-
-        # Create and populate transition probability matrix
-        self.A = np.zeros(shape=(self.q_len, self.q_len), dtype=np.float64)
-        for transition, probability in transition_matrix.items():
-            source, destination = transition.split("-")
-            self.A[self.q_map[source], self.q_map[destination]] = probability
-
-        # Make self.A stochastic (i.e. make rows add to 1)
-        # self.A /= self.A.sum(axis=1)[:, np.newaxis]
-        a_sums = self.A.sum(axis=1, keepdims=1)
-        a_sums[a_sums == 0] = 1
-        self.A /= a_sums
+        self.initialize(states, symbols, A, E, I)
 
-        # Create and populate emission probability matrix
-        self.E = np.zeros(shape=(self.q_len, self.s_len), dtype=np.float64)
-        for emission, probability in emission_matrix.items():
-            state, symbol = emission.split("-")
-            self.E[self.q_map[state], self.s_map[symbol]] = probability
+    @classmethod
+    def from_arrays(
+        cls,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix: np.ndarray,
+        emission_matrix: np.ndarray,
+        initial_probabilities: np.ndarray,
+        transition_matrix_log: np.ndarray = None,
+        emission_matrix_log: np.ndarray = None,
+        initial_probabilities_log: np.ndarray = None,
+    ):
 
-        # Make self.E stochastic (i.e. make rows add to 1)
-        # self.E /= self.E.sum(axis=1)[:, np.newaxis]
-        e_sums = self.E.sum(axis=1, keepdims=1)
-        e_sums[e_sums == 0] = 1
-        self.E /= e_sums
+        # Float64 arrays are used as given, rows are expected to be stochastic
+        hmm = cls.__new__(cls)
+        hmm.initialize(
+            states,
+            symbols,
+            transition_matrix,
+            emission_matrix,
+            initial_probabilities,
+            transition_matrix_log,
+            emission_matrix_log,
+            initial_probabilities_log,
+        )
+        return hmm
 
-        # Initial probability
-        self.I = [0.0] * self.q_len
-        for state, probability in initial_probabilities.items():
-            self.I[self.q_map[state]] = probability
+    def initialize(
+        self,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix: np.ndarray,
+        emission_matrix: np.ndarray,
+        initial_probabilities: np.ndarray,
+        transition_matrix_log: np.ndarray = None,
+        emission_matrix_log: np.ndarray = None,
+        initial_probabilities_log: np.ndarray = None,
+    ):
 
-        # Make self.I stochastic (i.e. adds to 1)
-        self.I = np.divide(self.I, sum(self.I))
+        self.Q, self.S = list(states), list(symbols)
+        self.q_len, self.s_len = len(self.Q), len(self.S)
+
+        # Create maps from states and symbols to integers that functions as unique identifiers
+        self.q_map = {q: i for i, q in enumerate(self.Q)}
+        self.s_map = {s: i for i, s in enumerate(self.S)}
+
+        # Lookup table from byte values to symbol identifiers
+        self.s_lut = symbol_table(self.S)
+
+        self.A = np.asarray(transition_matrix, dtype=np.float64)
+        self.E = np.asarray(emission_matrix, dtype=np.float64)
+        self.I = np.asarray(initial_probabilities, dtype=np.float64)
 
         # Create log-base-2 versions for log-space functions
-        self.A_log = np.array([[log2(x) for x in y] for y in self.A])
-        self.E_log = np.array([[log2(x) for x in y] for y in self.E])
-        self.I_log = np.array([log2(x) for x in self.I])
+        self.A_log = log2_array(self.A, transition_matrix_log)
+        self.E_log = log2_array(self.E, emission_matrix_log)
+        self.I_log = log2_array(self.I, initial_probabilities_log)
+
+        # Predecessors with a nonzero transition into every state, in CSR form
+        self.pred_ptr, self.pred_idx = transition_predecessors(self.A)
+        pred_dst = np.repeat(np.arange(self.q_len), np.diff(self.pred_ptr))
+        self.pred = self.A[self.pred_idx, pred_dst]
+        self.pred_log = self.A_log[self.pred_idx, pred_dst]
 
     def __repr__(self):
 
+        # Only needed for printing, kept off the decoding import path
+        import pandas as pd
+
         transition_data_frame = pd.DataFrame(self.A).rename(
             columns=lambda s: self.Q.__getitem__(int(s)),
             index=lambda s: self.Q.__getitem__(int(s)),
@@ -170,38 +356,33 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
 
         # Fill in first column
-        for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] * initial_probabilities[i]
+        mat[0] = emission_matrix[:, x[0]] * initial_probabilities
 
-        # Fill in the rest of the mat and mat_tb tables
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[i2, i] is the score of reaching state i at step j through state i2
         for j in range(1, n_col):
-            for i in range(0, n_row):
-                ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j - 1] * transition_matrix[0, i] * ep, 0
-                for i2 in range(1, n_row):
-                    pr = mat[i2, j - 1] * transition_matrix[i2, i] * ep
-                    if pr > mx:
-                        mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+            ep = emission_matrix[:, x[j]]
+            pr = mat[(j - 1) % 2, :, np.newaxis] * transition_matrix * ep[np.newaxis, :]
+            mat_tb[:, j] = pr.argmax(axis=0)
+            mat[j % 2] = pr[mat_tb[:, j], np.arange(n_row)]
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
-        for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+        omxi = int(mat[(n_col - 1) % 2].argmax())
+        omx = mat[(n_col - 1) % 2, omxi]
 
         # Backtrace
-        i, p = omxi, [omxi]
+        p = np.empty(n_col, dtype=np.int64)
+        p[n_col - 1] = omxi
         for j in range(n_col - 1, 0, -1):
-            i = mat_tb[i, j]
-            p.insert(0, i)
+            p[j - 1] = mat_tb[p[j], j]
 
         # Build path
         path = "".join([states[q] for q in p])
@@ -220,46 +401,452 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
 
         # Fill in first column
-        for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+        mat[0] = emission_matrix[:, x[0]] + initial_probabilities
 
-        # Fill in the rest of the mat and mat_tb tables
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[i2, i] is the score of reaching state i at step j through state i2
         for j in range(1, n_col):
-            for i in range(0, n_row):
-                ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j - 1] + transition_matrix[0, i] + ep, 0
-                for i2 in range(1, n_row):
-                    pr = mat[i2, j - 1] + transition_matrix[i2, i] + ep
-                    if pr > mx:
-                        mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+            ep = emission_matrix[:, x[j]]
+            pr = mat[(j - 1) % 2, :, np.newaxis] + transition_matrix + ep[np.newaxis, :]
+            mat_tb[:, j] = pr.argmax(axis=0)
+            mat[j % 2] = pr[mat_tb[:, j], np.arange(n_row)]
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
-        for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+        omxi = int(mat[(n_col - 1) % 2].argmax())
+        omx = mat[(n_col - 1) % 2, omxi]
 
         # Backtrace
-        i, p = omxi, [omxi]
+        p = np.empty(n_col, dtype=np.int64)
+        p[n_col - 1] = omxi
         for j in range(n_col - 1, 0, -1):
-            i = mat_tb[i, j]
-            p.insert(0, i)
+            p[j - 1] = mat_tb[p[j], j]
 
         # Build path
         path = "".join([states[q] for q in p])
 
         return omx, path
 
-    def convert_symbols(self, x: str) -> List[int]:
-        return list(map(self.s_map.get, x))
+    @staticmethod
+    def calculate_viterbi_log_sparse(
+        states: List[str],
+        predecessor_pointers,
+        predecessor_states,
+        predecessor_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+    ) -> Tuple[float, str]:
+
+        n_row, n_col = len(states), len(x)
+
+        # Destination state of every stored transition and the nonempty CSR rows
+        counts = np.diff(predecessor_pointers)
+        destinations = np.repeat(np.arange(n_row), counts)
+        reachable = counts > 0
+        starts = predecessor_pointers[:-1][reachable]
+        order = np.arange(len(predecessor_states))
+
+        # Probability information
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.full(shape=(2, n_row), fill_value=-np.inf, dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
+
+        # Fill in first column
+        mat[0] = emission_matrix[:, x[0]] + initial_probabilities
+
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[t] is the score of taking the t-th stored transition into step j
+        for j in range(1, n_col):
+            ep = emission_matrix[:, x[j]]
+            pr = mat[(j - 1) % 2, predecessor_states] + predecessor_matrix
+            pr += ep[destinations]
+            mat[j % 2, :] = -np.inf
+            if len(starts) > 0:
+                mx = np.maximum.reduceat(pr, starts)
+                hit = np.where(pr == np.repeat(mx, counts[reachable]), order, len(pr))
+                first = np.minimum.reduceat(hit, starts)
+                mat_tb[reachable, j] = predecessor_states[first]
+                mat[j % 2, reachable] = mx
+
+        # Find the final state with maximal probability
+        omxi = int(mat[(n_col - 1) % 2].argmax())
+        omx = mat[(n_col - 1) % 2, omxi]
+
+        # Backtrace
+        p = np.empty(n_col, dtype=np.int64)
+        p[n_col - 1] = omxi
+        for j in range(n_col - 1, 0, -1):
+            p[j - 1] = mat_tb[p[j], j]
+
+        # Build path
+        path = "".join([states[q] for q in p])
+
+        return omx, path
+
+    @staticmethod
+    def calculate_viterbi_log_checkpoint(
+        states: List[str],
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+        interval: int = None,
+    ) -> Tuple[float, str]:
+
+        n_row, n_col = len(states), len(x)
+
+        # Keep every interval-th column, O(n_row * sqrt(n_col)) memory by default
+        if interval is None:
+            interval = max(1, math.isqrt(n_col - 1) + 1)
+
+        def step(column, j):
+            ep = emission_matrix[:, x[j]]
+            pr = column[:, np.newaxis] + transition_matrix + ep[np.newaxis, :]
+            tb = pr.argmax(axis=0)
+            return pr[tb, np.arange(n_row)], tb
+
+        # Checkpoint information
+        # S(k, c * interval), score of the most likely path up to step c * interval with p = k
+        mat_cp = np.zeros(shape=(n_row, (n_col - 1) // interval + 1), dtype=np.float64)
+
+        # Fill in first column
+        column = emission_matrix[:, x[0]] + initial_probabilities
+        mat_cp[:, 0] = column
+
+        # Sweep the remaining columns, keeping only the checkpoints
+        for j in range(1, n_col):
+            column, _ = step(column, j)
+            if j % interval == 0:
+                mat_cp[:, j // interval] = column
+
+        # Find the final state with maximal probability
+        omxi = int(column.argmax())
+        omx = column[omxi]
+
+        # Backtrace one segment at a time, recomputing its traceback from the checkpoint
+        mat_tb = np.zeros(shape=(n_row, interval + 1), dtype=traceback_dtype(n_row))
+        p = np.empty(n_col, dtype=traceback_dtype(n_row))
+        p[n_col - 1] = omxi
+        for c in range((n_col - 2) // interval, -1, -1):
+            start, end = c * interval, min((c + 1) * interval, n_col - 1)
+            column = mat_cp[:, c]
+            for j in range(start + 1, end + 1):
+                column, mat_tb[:, j - start] = step(column, j)
+            for j in range(end, start, -1):
+                p[j - 1] = mat_tb[p[j], j - start]
+
+        # Build path
+        path = build_path(states, p)
+
+        return omx, path
+
+    @staticmethod
+    def calculate_viterbi_log_beam(
+        states: List[str],
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+        beam_width: int = None,
+        threshold: float = None,
+    ) -> Tuple[float, str]:
+
+        check_beam(beam_width, threshold)
+        n_row, n_col = len(states), len(x)
+
+        # Probability information
+        # S(k, i), score of the most likely path up to step i with p(i) = k that
+        # only goes through the states kept in the beam of every earlier step
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
+
+        # Fill in first column
+        mat[0] = emission_matrix[:, x[0]] + initial_probabilities
+        active = prune_beam(mat[0], beam_width, threshold)
+
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[b, i] is the score of reaching state i at step j through the b-th
+        # state of the beam, which costs O(beam * states) instead of O(states^2)
+        for j in range(1, n_col):
+            ep = emission_matrix[:, x[j]]
+            pr = mat[(j - 1) % 2, active, np.newaxis] + transition_matrix[active]
+            best = pr.argmax(axis=0)
+            mat_tb[:, j] = active[best]
+            mat[j % 2] = pr[best, np.arange(n_row)] + ep
+            active = prune_beam(mat[j % 2], beam_width, threshold)
+
+        # Find the final state with maximal probability
+        omxi = int(mat[(n_col - 1) % 2].argmax())
+        omx = mat[(n_col - 1) % 2, omxi]
+
+        # Backtrace
+        p = np.empty(n_col, dtype=np.int64)
+        p[n_col - 1] = omxi
+        for j in range(n_col - 1, 0, -1):
+            p[j - 1] = mat_tb[p[j], j]
+
+        # Build path
+        path = "".join([states[q] for q in p])
+
+        return omx, path
+
+    @staticmethod
+    def calculate_viterbi_batch(
+        transition_matrix, emission_matrix, initial_probabilities, x: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_batch, n_col = x.shape
+        n_row = transition_matrix.shape[0]
+
+        # Probability information
+        # S(b, k, i), score of the most likely path of sequence b up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(n_batch, 2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_batch, n_row, n_col), dtype=traceback_dtype(n_row))
+
+        # Fill in first column
+        mat[:, 0] = emission_matrix[:, x[:, 0]].T * initial_probabilities
+
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[b, i2, i] is the score of reaching state i at step j through state i2
+        for j in range(1, n_col):
+            ep = emission_matrix[:, x[:, j]].T
+            pr = (
+                mat[:, (j - 1) % 2, :, np.newaxis]
+                * transition_matrix[np.newaxis, :, :]
+                * ep[:, np.newaxis, :]
+            )
+            mat_tb[:, :, j] = pr.argmax(axis=1)
+            tb = mat_tb[:, np.newaxis, :, j]
+            mat[:, j % 2] = np.take_along_axis(pr, tb, axis=1)[:, 0, :]
+
+        # Find the final states with maximal probability
+        p = np.empty(shape=(n_batch, n_col), dtype=traceback_dtype(n_row))
+        p[:, n_col - 1] = mat[:, (n_col - 1) % 2].argmax(axis=1)
+        omx = mat[np.arange(n_batch), (n_col - 1) % 2, p[:, n_col - 1]]
+
+        # Backtrace
+        for j in range(n_col - 1, 0, -1):
+            p[:, j - 1] = mat_tb[np.arange(n_batch), p[:, j], j]
+
+        return omx, p
+
+    @staticmethod
+    def calculate_viterbi_batch_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_batch, n_col = x.shape
+        n_row = transition_matrix.shape[0]
+
+        # Probability information
+        # S(b, k, i), score of the most likely path of sequence b up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(n_batch, 2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_batch, n_row, n_col), dtype=traceback_dtype(n_row))
+
+        # Fill in first column
+        mat[:, 0] = emission_matrix[:, x[:, 0]].T + initial_probabilities
+
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[b, i2, i] is the score of reaching state i at step j through state i2
+        for j in range(1, n_col):
+            ep = emission_matrix[:, x[:, j]].T
+            pr = (
+                mat[:, (j - 1) % 2, :, np.newaxis]
+                + transition_matrix[np.newaxis, :, :]
+                + ep[:, np.newaxis, :]
+            )
+            mat_tb[:, :, j] = pr.argmax(axis=1)
+            tb = mat_tb[:, np.newaxis, :, j]
+            mat[:, j % 2] = np.take_along_axis(pr, tb, axis=1)[:, 0, :]
+
+        # Find the final states with maximal probability
+        p = np.empty(shape=(n_batch, n_col), dtype=traceback_dtype(n_row))
+        p[:, n_col - 1] = mat[:, (n_col - 1) % 2].argmax(axis=1)
+        omx = mat[np.arange(n_batch), (n_col - 1) % 2, p[:, n_col - 1]]
+
+        # Backtrace
+        for j in range(n_col - 1, 0, -1):
+            p[:, j - 1] = mat_tb[np.arange(n_batch), p[:, j], j]
+
+        return omx, p
+
+    @staticmethod
+    def calculate_viterbi_kbest_log(
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # S(q, r, i), score of the r-th most likely path up to step i with p(i) = q,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.full(shape=(2, n_row, k), fill_value=-np.inf, dtype=np.float64)
+
+        # Traceback information, the previous state and rank as q * k + r
+        mat_tb = np.zeros(shape=(n_col, n_row, k), dtype=traceback_dtype(n_row * k))
+
+        # Fill in first column, only one path ends in each state
+        mat[0, :, 0] = emission_matrix[:, x[0]] + initial_probabilities
+
+        # Fill in the rest of the mat and mat_tb tables, one column at a time
+        # pr[q2 * k + r, q] is the score of reaching state q at step j through
+        # the r-th path into state q2, the stable sort keeps the lowest q2 first
+        for j in range(1, n_col):
+            pr = mat[(j - 1) % 2, :, :, np.newaxis] + transition_matrix[:, np.newaxis]
+            pr = pr.reshape(n_row * k, n_row)
+            order = np.argsort(-pr, axis=0, kind="stable")[:k]
+            ep = emission_matrix[:, x[j]]
+            mat_tb[j] = order.T
+            mat[j % 2] = (np.take_along_axis(pr, order, axis=0) + ep[np.newaxis, :]).T
+
+        # Find the k final states and ranks with maximal probability
+        last = mat[(n_col - 1) % 2].reshape(-1)
+        omxi = np.argsort(-last, kind="stable")[:k]
+        omxi = omxi[last[omxi] > -np.inf]
+        omx = last[omxi]
+
+        # Backtrace every path
+        p = np.empty(shape=(len(omxi), n_col), dtype=np.int64)
+        p[:, n_col - 1], r = np.divmod(omxi, k)
+        for j in range(n_col - 1, 0, -1):
+            p[:, j - 1], r = np.divmod(mat_tb[j, p[:, j], r].astype(np.int64), k)
+
+        return omx, p
+
+    @staticmethod
+    def calculate_forward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> np.ndarray:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # F(k, i), log2 probability of emitting x[0..i] and ending in p(i) = k
+        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+
+        # Fill in first column
+        mat[:, 0] = emission_matrix[:, x[0]] + initial_probabilities
+
+        # Fill in the rest of the mat table, summing over the previous states
+        for j in range(1, n_col):
+            pr = mat[:, j - 1, np.newaxis] + transition_matrix
+            mat[:, j] = logsumexp2(pr, axis=0) + emission_matrix[:, x[j]]
+
+        return mat
+
+    @staticmethod
+    def calculate_backward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> np.ndarray:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # B(k, i), log2 probability of emitting x[i + 1..] given p(i) = k
+        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+
+        # Fill in the columns from the last one, summing over the next states
+        for j in range(n_col - 2, -1, -1):
+            ep = emission_matrix[:, x[j + 1]] + mat[:, j + 1]
+            mat[:, j] = logsumexp2(transition_matrix + ep[np.newaxis, :], axis=1)
+
+        return mat
+
+    def convert_symbols(self, x: Union[str, bytes, np.ndarray]) -> np.ndarray:
+        return encode_symbols(self.s_lut, self.s_map, x)
+
+    def decode_batch(
+        self,
+        kernel,
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        sequences: List[str],
+        batch_size: int = None,
+    ) -> List[Tuple[float, str]]:
+
+        # Bucket the sequences by length so each bucket is a dense 2-D array
+        buckets = {}
+        for index, sequence in enumerate(sequences):
+            buckets.setdefault(len(sequence), []).append(index)
+
+        states = np.array(self.Q, dtype=object)
+        results = [None] * len(sequences)
+        for length, indices in buckets.items():
+
+            # Bound the (batch, states, states) column buffer and the
+            # (batch, states, length) traceback to about 4M cells by default
+            size = batch_size or max(
+                1, BATCH_CELLS // (self.q_len * max(self.q_len, length))
+            )
+            for start in range(0, len(indices), size):
+                chunk = indices[start : start + size]
+
+                x = np.stack([self.convert_symbols(sequences[k]) for k in chunk])
+
+                scores, paths = kernel(
+                    transition_matrix, emission_matrix, initial_probabilities, x
+                )
+
+                # Build paths
+                for k, score, path in zip(chunk, scores, states[paths]):
+                    results[k] = score, "".join(path)
+
+        return results
+
+    def decode_ragged(
+        self,
+        kernel,
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        sequences: List[str],
+    ) -> List[Tuple[float, str]]:
+
+        if not len(sequences):
+            return []
+
+        # Concatenate the sequences into one flat buffer
+        encoded = [self.convert_symbols(x) for x in sequences]
+        offsets = np.zeros(shape=len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in encoded], out=offsets[1:])
+
+        scores, paths = kernel(
+            transition_matrix,
+            emission_matrix,
+            initial_probabilities,
+            np.concatenate(encoded),
+            offsets,
+        )
+
+        # Build paths
+        return [
+            (scores[b], build_path(self.Q, paths[offsets[b] : offsets[b + 1]]))
+            for b in range(len(encoded))
+        ]
 
     def joint_probability(self, p: str, x: str) -> float:
 
@@ -303,14 +890,136 @@ class HMM(object):
 
         return probability
 
-    def viterbi(self, x: str) -> Tuple[float, str]:
+    def viterbi(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, str]:
         return HMM.calculate_viterbi(
             self.Q, self.A, self.E, self.I, self.convert_symbols(x)
         )
 
-    def viterbi_log(self, x: str) -> Tuple[float, str]:
+    def viterbi_log(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, str]:
         return HMM.calculate_viterbi_log(
             self.Q, self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
         )
 
+    def viterbi_log_sparse(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, str]:
+        return HMM.calculate_viterbi_log_sparse(
+            self.Q,
+            self.pred_ptr,
+            self.pred_idx,
+            self.pred_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+        )
+
+    def viterbi_log_checkpoint(
+        self, x: Union[str, bytes, np.ndarray], interval: int = None
+    ) -> Tuple[float, str]:
+        return HMM.calculate_viterbi_log_checkpoint(
+            self.Q,
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+            interval=interval,
+        )
+
+    def viterbi_log_beam(
+        self,
+        x: Union[str, bytes, np.ndarray],
+        beam_width: int = None,
+        threshold: float = None,
+    ) -> Tuple[float, str]:
+        return HMM.calculate_viterbi_log_beam(
+            self.Q,
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+            beam_width=beam_width,
+            threshold=threshold,
+        )
+
+    def beam_agreement(
+        self, sequences: List[str], beam_width: int = None, threshold: float = None
+    ) -> Dict[str, float]:
+
+        # How often and by how much the beam changes the result of exact decoding
+        check_beam(beam_width, threshold)
+        changed, steps, steps_changed, loss = 0, 0, 0, []
+        for x in sequences:
+            x = self.convert_symbols(x)
+            score_e, path_e = self.viterbi_log(x)
+            score_a, path_a = self.viterbi_log_beam(x, beam_width, threshold)
+            changed += path_e != path_a
+            steps += len(path_e)
+            steps_changed += sum([q1 != q2 for q1, q2 in zip(path_e, path_a)])
+            loss.append(score_e - score_a)
+
+        return {
+            "sequences": len(sequences),
+            "paths_changed": changed / max(1, len(sequences)),
+            "steps_changed": steps_changed / max(1, steps),
+            "score_loss_mean": float(np.mean(loss)) if loss else 0.0,
+            "score_loss_max": float(np.max(loss)) if loss else 0.0,
+        }
+
+    def viterbi_batch(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            HMM.calculate_viterbi_batch, self.A, self.E, self.I, sequences, batch_size
+        )
+
+    def viterbi_batch_log(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            HMM.calculate_viterbi_batch_log,
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            sequences,
+            batch_size,
+        )
+
+    def viterbi_kbest_log(
+        self, x: Union[str, bytes, np.ndarray], k: int
+    ) -> List[Tuple[float, str]]:
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        scores, paths = HMM.calculate_viterbi_kbest_log(
+            self.A_log, self.E_log, self.I_log, self.convert_symbols(x), k
+        )
+        return [(score, build_path(self.Q, p)) for score, p in zip(scores, paths)]
+
+    def forward_log(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, np.ndarray]:
+        mat = HMM.calculate_forward_log(
+            self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
+        )
+        return float(logsumexp2(mat[:, -1], axis=0)), mat
+
+    def backward_log(
+        self, x: Union[str, bytes, np.ndarray]
+    ) -> Tuple[float, np.ndarray]:
+        x = self.convert_symbols(x)
+        mat = HMM.calculate_backward_log(self.A_log, self.E_log, self.I_log, x)
+        likelihood = logsumexp2(self.I_log + self.E_log[:, x[0]] + mat[:, 0], axis=0)
+        return float(likelihood), mat
+
+    def likelihood_log(self, x: Union[str, bytes, np.ndarray]) -> float:
+        return self.forward_log(x)[0]
+
+    def posterior(self, x: Union[str, bytes, np.ndarray]) -> np.ndarray:
+
+        # P(p(i) = k | x) = F(k, i) * B(k, i) / P(x)
+        x = self.convert_symbols(x)
+        likelihood, forward = self.forward_log(x)
+        _, backward = self.backward_log(x)
+        return np.exp2(forward + backward - likelihood)
+
+    def posterior_decoding(self, x: Union[str, bytes, np.ndarray]) -> str:
+
+        # Most probable state at every step on its own
+        return build_path(self.Q, self.posterior(x).argmax(axis=0))
+
     pass
@@ -22,10 +22,29 @@
 """Hidden Markov Model using NumPy with Numba"""
 import numba as nb
 import numpy as np
+import os
+import types
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Tuple
 
-from hmm.hmm_jhu import HMM
+from hmm.hmm_jhu import HMM, build_path, logsumexp2, traceback_dtype
+
+
+def rename(function, name: str):
+
+    # Copy of a function under another name, the on-disk cache is keyed by the
+    # qualified name and would otherwise mix up builds with different options
+    copy = types.FunctionType(
+        function.__code__,
+        function.__globals__,
+        name,
+        function.__defaults__,
+        function.__closure__,
+    )
+    copy.__qualname__ = function.__qualname__.rsplit(".", 1)[0] + "." + name
+    return copy
 
 
 class HMMNumba(HMM):
@@ -37,47 +56,62 @@ class HMMNumba(HMM):
         m.viterbi("a")
 
         # HMMNumba.calculate_viterbi_log(m.Q, m.A_log, m.E_log, m.I_log, m.convert_symbols("a"))
-        m.viterbi("a")
+        m.viterbi_log("a")
+
+        m.viterbi_log_sparse("a")
+
+        m.viterbi_batch(["a"])
+        m.viterbi_batch_log(["a"])
+
+        m.viterbi_ragged_log(["a"])
+        m.viterbi_ragged_log(["a"], parallel=False)
+
+        m.viterbi_kbest_log("a", 2)
+
+        m.forward_log("a")
+        m.backward_log("a")
 
     @staticmethod
-    @nb.jit(nopython=True)
+    @nb.jit(nopython=True, cache=True)
     def calculate_viterbi(
         states: List[str],
         transition_matrix,
         emission_matrix,
         initial_probabilities,
         x: List[int],
+        traceback_dtype=np.int32,
     ) -> Tuple[float, str]:
 
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] * initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j - 1] * transition_matrix[0, i] * ep, 0
+                mx, mxi = mat[(j - 1) % 2, 0] * transition_matrix[0, i] * ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2, j - 1] * transition_matrix[i2, i] * ep
+                    pr = mat[(j - 1) % 2, i2] * transition_matrix[i2, i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -91,44 +125,108 @@ class HMMNumba(HMM):
         return omx, path
 
     @staticmethod
-    @nb.jit(nopython=True)
+    @nb.jit(nopython=True, cache=True)
     def calculate_viterbi_log(
         states: List[str],
         transition_matrix,
         emission_matrix,
         initial_probabilities,
         x: List[int],
+        traceback_dtype=np.int32,
     ) -> Tuple[float, str]:
 
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j - 1] + transition_matrix[0, i] + ep, 0
+                mx, mxi = mat[(j - 1) % 2, 0] + transition_matrix[0, i] + ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2, j - 1] + transition_matrix[i2, i] + ep
+                    pr = mat[(j - 1) % 2, i2] + transition_matrix[i2, i] + ep
+                    if pr > mx:
+                        mx, mxi = pr, i2
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
+
+        # Find the final state with maximal probability
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
+        for i in range(1, n_row):
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
+
+        # Backtrace
+        i, p = omxi, [omxi]
+        for j in range(n_col - 1, 0, -1):
+            i = mat_tb[i, j]
+            p.insert(0, i)
+
+        # Build path
+        path = "".join([states[q] for q in p])
+
+        return omx, path
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_viterbi_log_sparse(
+        states: List[str],
+        predecessor_pointers,
+        predecessor_states,
+        predecessor_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+        traceback_dtype=np.int32,
+    ) -> Tuple[float, str]:
+
+        n_row, n_col = len(states), len(x)
+
+        # Probability information
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
+
+        # Fill in first column
+        for i in range(0, n_row):
+            mat[0, i] = emission_matrix[i, x[0]] + initial_probabilities[i]
+
+        # Fill in the rest of the mat and mat_tb tables, visiting only the
+        # predecessors with a nonzero transition into state i
+        for j in range(1, n_col):
+            for i in range(0, n_row):
+                start, end = predecessor_pointers[i], predecessor_pointers[i + 1]
+                if start == end:
+                    mat[j % 2, i] = -np.inf
+                    continue
+                ep = emission_matrix[i, x[j]]
+                i2 = predecessor_states[start]
+                mx, mxi = mat[(j - 1) % 2, i2] + predecessor_matrix[start] + ep, i2
+                for t in range(start + 1, end):
+                    i2 = predecessor_states[t]
+                    pr = mat[(j - 1) % 2, i2] + predecessor_matrix[t] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -141,12 +239,431 @@ class HMMNumba(HMM):
 
         return omx, path
 
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_viterbi_batch(
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x,
+        traceback_dtype=np.int32,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_batch, n_col = x.shape
+        n_row = transition_matrix.shape[0]
+
+        # Probability information
+        # S(b, k, i), score of the most likely path of sequence b up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(n_batch, 2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_batch, n_row, n_col), dtype=traceback_dtype)
+
+        # Final scores and paths
+        omx = np.zeros(shape=n_batch, dtype=np.float64)
+        p = np.zeros(shape=(n_batch, n_col), dtype=traceback_dtype)
+
+        for b in range(0, n_batch):
+
+            # Fill in first column
+            for i in range(0, n_row):
+                mat[b, 0, i] = emission_matrix[i, x[b, 0]] * initial_probabilities[i]
+
+            # Fill in the rest of the mat and mat_tb tables
+            for j in range(1, n_col):
+                for i in range(0, n_row):
+                    ep = emission_matrix[i, x[b, j]]
+                    mx, mxi = mat[b, (j - 1) % 2, 0] * transition_matrix[0, i] * ep, 0
+                    for i2 in range(1, n_row):
+                        pr = mat[b, (j - 1) % 2, i2] * transition_matrix[i2, i] * ep
+                        if pr > mx:
+                            mx, mxi = pr, i2
+                    mat[b, j % 2, i], mat_tb[b, i, j] = mx, mxi
+
+            # Find the final state with maximal probability
+            omxi = 0
+            omx[b] = mat[b, (n_col - 1) % 2, 0]
+            for i in range(1, n_row):
+                if mat[b, (n_col - 1) % 2, i] > omx[b]:
+                    omx[b], omxi = mat[b, (n_col - 1) % 2, i], i
+
+            # Backtrace
+            p[b, n_col - 1] = omxi
+            for j in range(n_col - 1, 0, -1):
+                p[b, j - 1] = mat_tb[b, p[b, j], j]
+
+        return omx, p
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_viterbi_batch_log(
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x,
+        traceback_dtype=np.int32,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_batch, n_col = x.shape
+        n_row = transition_matrix.shape[0]
+
+        # Probability information
+        # S(b, k, i), score of the most likely path of sequence b up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(n_batch, 2, n_row), dtype=np.float64)
+
+        # Traceback information
+        mat_tb = np.zeros(shape=(n_batch, n_row, n_col), dtype=traceback_dtype)
+
+        # Final scores and paths
+        omx = np.zeros(shape=n_batch, dtype=np.float64)
+        p = np.zeros(shape=(n_batch, n_col), dtype=traceback_dtype)
+
+        for b in range(0, n_batch):
+
+            # Fill in first column
+            for i in range(0, n_row):
+                mat[b, 0, i] = emission_matrix[i, x[b, 0]] + initial_probabilities[i]
+
+            # Fill in the rest of the mat and mat_tb tables
+            for j in range(1, n_col):
+                for i in range(0, n_row):
+                    ep = emission_matrix[i, x[b, j]]
+                    mx, mxi = mat[b, (j - 1) % 2, 0] + transition_matrix[0, i] + ep, 0
+                    for i2 in range(1, n_row):
+                        pr = mat[b, (j - 1) % 2, i2] + transition_matrix[i2, i] + ep
+                        if pr > mx:
+                            mx, mxi = pr, i2
+                    mat[b, j % 2, i], mat_tb[b, i, j] = mx, mxi
+
+            # Find the final state with maximal probability
+            omxi = 0
+            omx[b] = mat[b, (n_col - 1) % 2, 0]
+            for i in range(1, n_row):
+                if mat[b, (n_col - 1) % 2, i] > omx[b]:
+                    omx[b], omxi = mat[b, (n_col - 1) % 2, i], i
+
+            # Backtrace
+            p[b, n_col - 1] = omxi
+            for j in range(n_col - 1, 0, -1):
+                p[b, j - 1] = mat_tb[b, p[b, j], j]
+
+        return omx, p
+
+    @staticmethod
+    @nb.jit(nopython=True, nogil=True, parallel=True, cache=True)
+    def calculate_viterbi_ragged_log(
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x,
+        offsets,
+        traceback_dtype=np.int32,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        # Sequence b is x[offsets[b] : offsets[b + 1]], its path is written to the
+        # same slice of paths
+        n_row, n_batch = transition_matrix.shape[0], len(offsets) - 1
+        scores = np.full(n_batch, -np.inf)
+        paths = np.zeros(len(x), dtype=np.int64)
+
+        # Sequences are independent, every thread decodes whole sequences
+        for b in nb.prange(n_batch):
+            start, n_col = offsets[b], offsets[b + 1] - offsets[b]
+            if n_col == 0:
+                continue
+
+            # Probability information
+            # S(k, i), score of the most likely path up to step i with p(i) = k,
+            # only the columns for steps i - 1 and i are kept
+            mat = np.zeros(shape=(2, n_row), dtype=np.float64)
+
+            # Traceback information
+            mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
+
+            # Fill in first column
+            for i in range(0, n_row):
+                mat[0, i] = emission_matrix[i, x[start]] + initial_probabilities[i]
+
+            # Fill in the rest of the mat and mat_tb tables
+            for j in range(1, n_col):
+                for i in range(0, n_row):
+                    ep = emission_matrix[i, x[start + j]]
+                    mx, mxi = mat[(j - 1) % 2, 0] + transition_matrix[0, i] + ep, 0
+                    for i2 in range(1, n_row):
+                        pr = mat[(j - 1) % 2, i2] + transition_matrix[i2, i] + ep
+                        if pr > mx:
+                            mx, mxi = pr, i2
+                    mat[j % 2, i], mat_tb[i, j] = mx, mxi
+
+            # Find the final state with maximal probability
+            omx, omxi = mat[(n_col - 1) % 2, 0], 0
+            for i in range(1, n_row):
+                if mat[(n_col - 1) % 2, i] > omx:
+                    omx, omxi = mat[(n_col - 1) % 2, i], i
+            scores[b] = omx
+
+            # Backtrace
+            paths[start + n_col - 1] = omxi
+            for j in range(n_col - 1, 0, -1):
+                paths[start + j - 1] = mat_tb[paths[start + j], j]
+
+        return scores, paths
+
+    # The same kernel without prange threads, for callers running their own threads
+    calculate_viterbi_ragged_log_nogil = staticmethod(
+        nb.jit(nopython=True, nogil=True, cache=True)(
+            rename(
+                calculate_viterbi_ragged_log.__func__.py_func,
+                "calculate_viterbi_ragged_log_nogil",
+            )
+        )
+    )
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_viterbi_kbest_log(
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        x: List[int],
+        k: int,
+        traceback_dtype=np.int32,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # S(q, r, i), score of the r-th most likely path up to step i with p(i) = q,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.full((2, n_row, k), -np.inf)
+
+        # Traceback information, the previous state and rank as q * k + r
+        mat_tb = np.zeros((n_col, n_row, k), dtype=traceback_dtype)
+
+        # Fill in first column, only one path ends in each state
+        for i in range(0, n_row):
+            mat[0, i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+
+        # Fill in the rest of the mat and mat_tb tables, the stable sort keeps the
+        # lowest previous state first among equal scores
+        pr = np.empty(n_row * k)
+        for j in range(1, n_col):
+            for i in range(0, n_row):
+                for i2 in range(0, n_row):
+                    for r in range(0, k):
+                        pr[i2 * k + r] = (
+                            mat[(j - 1) % 2, i2, r] + transition_matrix[i2, i]
+                        )
+                order = np.argsort(-pr, kind="mergesort")
+                for r in range(0, k):
+                    mat[j % 2, i, r] = pr[order[r]] + emission_matrix[i, x[j]]
+                    mat_tb[j, i, r] = order[r]
+
+        # Find the k final states and ranks with maximal probability
+        last = mat[(n_col - 1) % 2].copy().reshape(n_row * k)
+        omxi = np.argsort(-last, kind="mergesort")[:k]
+        n_path = 0
+        while n_path < len(omxi) and last[omxi[n_path]] > -np.inf:
+            n_path += 1
+        omx = np.empty(n_path)
+
+        # Backtrace every path
+        p = np.empty((n_path, n_col), dtype=np.int64)
+        for b in range(0, n_path):
+            omx[b] = last[omxi[b]]
+            i, r = omxi[b] // k, omxi[b] % k
+            p[b, n_col - 1] = i
+            for j in range(n_col - 1, 0, -1):
+                i, r = mat_tb[j, i, r] // k, mat_tb[j, i, r] % k
+                p[b, j - 1] = i
+
+        return omx, p
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_forward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> np.ndarray:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # F(k, i), log2 probability of emitting x[0..i] and ending in p(i) = k
+        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+
+        # Fill in first column
+        for i in range(0, n_row):
+            mat[i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+
+        # Fill in the rest of the mat table, summing over the previous states
+        # shifted by their maximum
+        for j in range(1, n_col):
+            for i in range(0, n_row):
+                mx = mat[0, j - 1] + transition_matrix[0, i]
+                for i2 in range(1, n_row):
+                    mx = max(mx, mat[i2, j - 1] + transition_matrix[i2, i])
+                total = 0.0
+                for i2 in range(0, n_row):
+                    total += 2.0 ** (mat[i2, j - 1] + transition_matrix[i2, i] - mx)
+                mat[i, j] = mx + np.log2(total) + emission_matrix[i, x[j]]
+
+        return mat
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_backward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> np.ndarray:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # B(k, i), log2 probability of emitting x[i + 1..] given p(i) = k
+        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+
+        # Fill in the columns from the last one, summing over the next states
+        # shifted by their maximum
+        for j in range(n_col - 2, -1, -1):
+            for i in range(0, n_row):
+                mx = -np.inf
+                for i2 in range(0, n_row):
+                    pr = (
+                        transition_matrix[i, i2]
+                        + emission_matrix[i2, x[j + 1]]
+                        + mat[i2, j + 1]
+                    )
+                    mx = max(mx, pr)
+                total = 0.0
+                for i2 in range(0, n_row):
+                    pr = (
+                        transition_matrix[i, i2]
+                        + emission_matrix[i2, x[j + 1]]
+                        + mat[i2, j + 1]
+                    )
+                    total += 2.0 ** (pr - mx)
+                mat[i, j] = mx + np.log2(total)
+
+        return mat
+
     def viterbi(self, x: str) -> Tuple[float, str]:
         return HMMNumba.calculate_viterbi(
-            self.Q, self.A, self.E, self.I, self.convert_symbols(x)
+            self.Q,
+            self.A,
+            self.E,
+            self.I,
+            self.convert_symbols(x),
+            traceback_dtype(self.q_len),
         )
 
     def viterbi_log(self, x: str) -> Tuple[float, str]:
         return HMMNumba.calculate_viterbi_log(
-            self.Q, self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
+            self.Q,
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+            traceback_dtype(self.q_len),
+        )
+
+    def viterbi_log_sparse(self, x: str) -> Tuple[float, str]:
+        return HMMNumba.calculate_viterbi_log_sparse(
+            self.Q,
+            self.pred_ptr,
+            self.pred_idx,
+            self.pred_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+            traceback_dtype(self.q_len),
         )
+
+    def viterbi_kbest_log(self, x: str, k: int) -> List[Tuple[float, str]]:
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        scores, paths = HMMNumba.calculate_viterbi_kbest_log(
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            self.convert_symbols(x),
+            k,
+            traceback_dtype(self.q_len * k),
+        )
+        return [(score, build_path(self.Q, p)) for score, p in zip(scores, paths)]
+
+    def forward_log(self, x: str) -> Tuple[float, np.ndarray]:
+        mat = HMMNumba.calculate_forward_log(
+            self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
+        )
+        return float(logsumexp2(mat[:, -1], axis=0)), mat
+
+    def backward_log(self, x: str) -> Tuple[float, np.ndarray]:
+        x = self.convert_symbols(x)
+        mat = HMMNumba.calculate_backward_log(self.A_log, self.E_log, self.I_log, x)
+        likelihood = logsumexp2(self.I_log + self.E_log[:, x[0]] + mat[:, 0], axis=0)
+        return float(likelihood), mat
+
+    def viterbi_batch(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            partial(
+                HMMNumba.calculate_viterbi_batch,
+                traceback_dtype=traceback_dtype(self.q_len),
+            ),
+            self.A,
+            self.E,
+            self.I,
+            sequences,
+            batch_size,
+        )
+
+    def viterbi_batch_log(
+        self, sequences: List[str], batch_size: int = None
+    ) -> List[Tuple[float, str]]:
+        return self.decode_batch(
+            partial(
+                HMMNumba.calculate_viterbi_batch_log,
+                traceback_dtype=traceback_dtype(self.q_len),
+            ),
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            sequences,
+            batch_size,
+        )
+
+    def viterbi_ragged_log(
+        self, sequences: List[str], parallel: bool = True
+    ) -> List[Tuple[float, str]]:
+        if parallel:
+            kernel = HMMNumba.calculate_viterbi_ragged_log
+        else:
+            kernel = HMMNumba.calculate_viterbi_ragged_log_nogil
+        return self.decode_ragged(
+            partial(kernel, traceback_dtype=traceback_dtype(self.q_len)),
+            self.A_log,
+            self.E_log,
+            self.I_log,
+            sequences,
+        )
+
+    def viterbi_threaded_log(
+        self, sequences: List[str], threads: int = None, chunk_size: int = None
+    ) -> List[Tuple[float, str]]:
+
+        # The kernel releases the GIL, so chunks decode concurrently on threads
+        threads = threads or os.cpu_count()
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(sequences) // (4 * threads)))
+
+        chunks = [
+            sequences[start : start + chunk_size]
+            for start in range(0, len(sequences), chunk_size)
+        ]
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = executor.map(
+                partial(self.viterbi_ragged_log, parallel=False), chunks
+            )
+            return [result for chunk in results for result in chunk]
@@ -0,0 +1,123 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Online Viterbi decoding over a stream of observations using NumPy"""
+import numpy as np
+
+from collections import deque
+
+from hmm.hmm_jhu import HMM, traceback_dtype
+
+
+class OnlineViterbi(object):
+    def __init__(self, hmm: HMM, lag: int = None):
+
+        self.hmm = hmm
+        self.lag = lag
+
+        # S(k), log score of the most likely path up to the latest step with p = k
+        self.column = None
+
+        # Traceback columns for the steps that are not decided yet
+        self.window = deque()
+
+        # Step of the first undecided state and of the latest observation
+        self.offset, self.position = 0, -1
+
+        # Decoded states waiting to be read
+        self.decoded = deque()
+
+        self.score = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.decoded:
+            raise StopIteration
+        return self.decoded.popleft()
+
+    def push(self, symbols: str):
+
+        hmm, rows = self.hmm, np.arange(self.hmm.q_len)
+
+        for symbol in hmm.convert_symbols(symbols):
+            ep = hmm.E_log[:, symbol]
+            self.position += 1
+
+            if self.column is None:
+                self.column = ep + hmm.I_log
+            else:
+                pr = self.column[:, np.newaxis] + hmm.A_log + ep[np.newaxis, :]
+                tb = pr.argmax(axis=0).astype(traceback_dtype(hmm.q_len))
+                self.column = pr[tb, rows]
+
+                # Only needed while the previous step is still undecided
+                if self.position > self.offset:
+                    self.window.append(tb)
+
+            self.decide()
+
+    def decide(self):
+
+        # Follow every surviving path back until they all share one state,
+        # self.window[k] maps the states at step offset + k + 1 to step offset + k
+        survivors = np.arange(self.hmm.q_len)
+        for k in range(len(self.window), -1, -1):
+            if len(survivors) == 1:
+                self.emit(self.offset + k, int(survivors[0]))
+                break
+            if k > 0:
+                survivors = np.unique(self.window[k - 1][survivors])
+
+        # Force a decision on states older than the allowed lag
+        if self.lag is not None and self.position - self.offset >= self.lag:
+            step, state = self.position - self.lag, int(self.column.argmax())
+            for k in range(len(self.window) - 1, step - self.offset - 1, -1):
+                state = int(self.window[k][state])
+            self.emit(step, state)
+
+    def emit(self, step: int, state: int):
+
+        # Backtrace from the decided state to the first undecided step
+        p = [state]
+        for k in range(step - self.offset - 1, -1, -1):
+            state = int(self.window[k][state])
+            p.append(state)
+
+        for q in reversed(p):
+            self.decoded.append(self.hmm.Q[q])
+
+        # Traceback columns pointing into decided steps are no longer needed
+        for _ in range(step - self.offset + 1):
+            if self.window:
+                self.window.popleft()
+        self.offset = step + 1
+
+    def flush(self) -> float:
+
+        # End of stream, decide the remaining states from the best final state
+        if self.column is not None:
+            self.score = self.column.max()
+            if self.offset <= self.position:
+                self.emit(self.position, int(self.column.argmax()))
+
+        return self.score
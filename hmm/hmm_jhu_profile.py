@@ -22,9 +22,16 @@
 """Profile Hidden Markov Model using NumPy"""
 import math
 import numpy as np
-import pandas as pd
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
+
+from hmm.hmm_jhu import (
+    encode_symbols,
+    log2_array,
+    parse_model,
+    symbol_table,
+    traceback_dtype,
+)
 
 
 def log2(x):
@@ -39,76 +46,96 @@ class HMM(object):
         initial_probabilities: Dict[str, float],
     ):
 
-        # Initialize states and symbols
-        self.Q, self.S = set(), set()
+        states, symbols, A, E, I = parse_model(
+            transition_matrix, emission_matrix, initial_probabilities
+        )
 
-        # Add state labels to the set self.Q
-        for transition, probability in transition_matrix.items():
-            source, destination = transition.split("-")
-            self.Q.add(source)
-            self.Q.add(destination)
+        # Make A stochastic (i.e. make rows add to 1)
+        a_sums = A.sum(axis=1, keepdims=1)
+        a_sums[a_sums == 0] = 1
+        A /= a_sums
 
-        # Add symbols to the set self.S
-        for emission, probability in emission_matrix.items():
-            state, symbol = emission.split("-")
-            self.Q.add(state)
-            self.S.add(symbol)
+        # Make E stochastic (i.e. make rows add to 1)
+        e_sums = E.sum(axis=1, keepdims=1)
+        e_sums[e_sums == 0] = 1
+        E /= e_sums
 
-        # Sort the sets self.Q and self.S
-        self.Q = sorted(list(self.Q))
-        self.S = sorted(list(self.S))
-        self.q_len, self.s_len = len(self.Q), len(self.S)
+        # Make I stochastic (i.e. adds to 1)
+        I = np.divide(I, sum(I))
 
-        # Create maps from states and symbols to integers that functions as unique identifiers
-        self.q_map, self.s_map = {}, {}
-        for i in range(len(self.Q)):
-            self.q_map[self.Q[i]] = i
-        for i in range(len(self.S)):
-            self.s_map[self.S[i]] = i
-
-        # Create and populate transition probability matrix
-        self.A = np.zeros(shape=(self.q_len, self.q_len), dtype=np.float64)
-        for transition, probability in transition_matrix.items():
-            source, destination = transition.split("-")
-            self.A[self.q_map[source], self.q_map[destination]] = probability
-
-        # Make self.A stochastic (i.e. make rows add to 1)
-        # self.A /= self.A.sum(axis=1)[:, np.newaxis]
-        a_sums = self.A.sum(axis=1, keepdims=1)
-        a_sums[a_sums == 0] = 1
-        self.A /= a_sums
+        self.initialize(states, symbols, A, E, I)
 
-        # Create and populate emission probability matrix
-        self.E = np.zeros(shape=(self.q_len, self.s_len), dtype=np.float64)
-        for emission, probability in emission_matrix.items():
-            state, symbol = emission.split("-")
-            self.E[self.q_map[state], self.s_map[symbol]] = probability
+    @classmethod
+    def from_arrays(
+        cls,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix: np.ndarray,
+        emission_matrix: np.ndarray,
+        initial_probabilities: np.ndarray,
+        transition_matrix_log: np.ndarray = None,
+        emission_matrix_log: np.ndarray = None,
+        initial_probabilities_log: np.ndarray = None,
+    ):
 
-        # Make self.E stochastic (i.e. make rows add to 1)
-        # self.E /= self.E.sum(axis=1)[:, np.newaxis]
-        e_sums = self.E.sum(axis=1, keepdims=1)
-        e_sums[e_sums == 0] = 1
-        self.E /= e_sums
+        # Float64 arrays are used as given, rows are expected to be stochastic
+        hmm = cls.__new__(cls)
+        hmm.initialize(
+            states,
+            symbols,
+            transition_matrix,
+            emission_matrix,
+            initial_probabilities,
+            transition_matrix_log,
+            emission_matrix_log,
+            initial_probabilities_log,
+        )
+        return hmm
 
-        # Initial probability
-        self.I = [0.0] * self.q_len
-        for state, probability in initial_probabilities.items():
-            self.I[self.q_map[state]] = probability
+    def initialize(
+        self,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix: np.ndarray,
+        emission_matrix: np.ndarray,
+        initial_probabilities: np.ndarray,
+        transition_matrix_log: np.ndarray = None,
+        emission_matrix_log: np.ndarray = None,
+        initial_probabilities_log: np.ndarray = None,
+    ):
 
-        # Make self.I stochastic (i.e. adds to 1)
-        self.I = np.divide(self.I, sum(self.I))
+        self.Q, self.S = list(states), list(symbols)
+        self.q_len, self.s_len = len(self.Q), len(self.S)
+
+        # Create maps from states and symbols to integers that functions as unique identifiers
+        self.q_map = {q: i for i, q in enumerate(self.Q)}
+        self.s_map = {s: i for i, s in enumerate(self.S)}
+
+        # Lookup table from byte values to symbol identifiers
+        self.s_lut = symbol_table(self.S)
+
+        self.A = np.asarray(transition_matrix, dtype=np.float64)
+        self.E = np.asarray(emission_matrix, dtype=np.float64)
+        self.I = np.asarray(initial_probabilities, dtype=np.float64)
 
         # Create log-base-2 versions for log-space functions
-        self.A_log = np.array([[log2(x) for x in y] for y in self.A])
-        self.E_log = np.array([[log2(x) for x in y] for y in self.E])
-        self.I_log = np.array([log2(x) for x in self.I])
+        self.A_log = log2_array(self.A, transition_matrix_log)
+        self.E_log = log2_array(self.E, emission_matrix_log)
+        self.I_log = log2_array(self.I, initial_probabilities_log)
 
         # Save deletion states
         self.deletion_states = [q for q in self.Q if str(q).startswith("D")]
         self.deletion_states_mapped = [self.q_map[q] for q in self.deletion_states]
 
+        # Boolean mask of the deletion states, indexed by state identifier
+        self.deletion_mask = np.zeros(shape=self.q_len, dtype=np.bool_)
+        self.deletion_mask[self.deletion_states_mapped] = True
+
     def __repr__(self):
 
+        # Only needed for printing, kept off the decoding import path
+        import pandas as pd
+
         transition_data_frame = pd.DataFrame(self.A).rename(
             columns=lambda s: self.Q.__getitem__(int(s)),
             index=lambda s: self.Q.__getitem__(int(s)),
@@ -175,34 +202,36 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] * initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2, :] = 0.0
             for i in range(0, n_row):
-                offset = -1 if i not in deletion_states else 0
+                offset = -1 if not deletion_states[i] else 0
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j + offset] * transition_matrix[0, i] * ep, 0
+                mx, mxi = mat[(j + offset) % 2, 0] * transition_matrix[0, i] * ep, 0
                 for i2 in range(1, n_row):
-                    offset = -1 if i not in deletion_states else 0
-                    pr = mat[i2, j + offset] * transition_matrix[i2, i] * ep
+                    offset = -1 if not deletion_states[i] else 0
+                    pr = mat[(j + offset) % 2, i2] * transition_matrix[i2, i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -228,34 +257,36 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype(n_row))
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2, :] = 0.0
             for i in range(0, n_row):
-                offset = -1 if i not in deletion_states else 0
+                offset = -1 if not deletion_states[i] else 0
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j + offset] + transition_matrix[0, i] + ep, 0
+                mx, mxi = mat[(j + offset) % 2, 0] + transition_matrix[0, i] + ep, 0
                 for i2 in range(1, n_row):
-                    offset = -1 if i not in deletion_states else 0
-                    pr = mat[i2, j + offset] + transition_matrix[i2, i] + ep
+                    offset = -1 if not deletion_states[i] else 0
+                    pr = mat[(j + offset) % 2, i2] + transition_matrix[i2, i] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -268,8 +299,8 @@ class HMM(object):
 
         return omx, path
 
-    def convert_symbols(self, x: str) -> List[int]:
-        return list(map(self.s_map.get, x))
+    def convert_symbols(self, x: Union[str, bytes, np.ndarray]) -> np.ndarray:
+        return encode_symbols(self.s_lut, self.s_map, x)
 
     def joint_probability(self, p: str, x: str) -> float:
 
@@ -313,24 +344,24 @@ class HMM(object):
 
         return probability
 
-    def viterbi(self, x: str) -> Tuple[float, str]:
+    def viterbi(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, str]:
         return HMM.calculate_viterbi(
             self.Q,
             self.A,
             self.E,
             self.I,
             self.convert_symbols(x),
-            deletion_states=self.deletion_states_mapped,
+            deletion_states=self.deletion_mask,
         )
 
-    def viterbi_log(self, x: str) -> Tuple[float, str]:
+    def viterbi_log(self, x: Union[str, bytes, np.ndarray]) -> Tuple[float, str]:
         return HMM.calculate_viterbi_log(
             self.Q,
             self.A_log,
             self.E_log,
             self.I_log,
             self.convert_symbols(x),
-            deletion_states=self.deletion_states_mapped,
+            deletion_states=self.deletion_mask,
         )
 
     pass
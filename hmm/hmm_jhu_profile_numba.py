@@ -25,6 +25,7 @@ import numpy as np
 
 from typing import List, Tuple
 
+from hmm.hmm_jhu import traceback_dtype
 from hmm.hmm_jhu_profile import HMM
 
 
@@ -37,10 +38,10 @@ class HMMNumba(HMM):
         m.viterbi("a")
 
         # HMMNumba.calculate_viterbi_log(m.Q, m.A_log, m.E_log, m.I_log, m.convert_symbols("a"))
-        m.viterbi("a")
+        m.viterbi_log("a")
 
     @staticmethod
-    @nb.jit(nopython=True)
+    @nb.jit(nopython=True, cache=True)
     def calculate_viterbi(
         states: List[str],
         transition_matrix,
@@ -48,39 +49,42 @@ class HMMNumba(HMM):
         initial_probabilities,
         x: List[int],
         deletion_states=None,
+        traceback_dtype=np.int32,
     ) -> Tuple[float, str]:
 
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] * initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2, :] = 0.0
             for i in range(0, n_row):
-                offset = -1 if i not in deletion_states else 0
+                offset = -1 if not deletion_states[i] else 0
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j + offset] * transition_matrix[0, i] * ep, 0
+                mx, mxi = mat[(j + offset) % 2, 0] * transition_matrix[0, i] * ep, 0
                 for i2 in range(1, n_row):
-                    offset = -1 if i not in deletion_states else 0
-                    pr = mat[i2, j + offset] * transition_matrix[i2, i] * ep
+                    offset = -1 if not deletion_states[i] else 0
+                    pr = mat[(j + offset) % 2, i2] * transition_matrix[i2, i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -94,7 +98,7 @@ class HMMNumba(HMM):
         return omx, path
 
     @staticmethod
-    @nb.jit(nopython=True)
+    @nb.jit(nopython=True, cache=True)
     def calculate_viterbi_log(
         states: List[str],
         transition_matrix,
@@ -102,39 +106,42 @@ class HMMNumba(HMM):
         initial_probabilities,
         x: List[int],
         deletion_states=None,
+        traceback_dtype=np.int32,
     ) -> Tuple[float, str]:
 
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = np.zeros(shape=(n_row, n_col), dtype=np.float64)
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = np.zeros(shape=(2, n_row), dtype=np.float64)
 
         # Traceback information
-        mat_tb = np.zeros(shape=(n_row, n_col), dtype=np.int32)
+        mat_tb = np.zeros(shape=(n_row, n_col), dtype=traceback_dtype)
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i, 0] = emission_matrix[i, x[0]] + initial_probabilities[i]
+            mat[0, i] = emission_matrix[i, x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2, :] = 0.0
             for i in range(0, n_row):
-                offset = -1 if i not in deletion_states else 0
+                offset = -1 if not deletion_states[i] else 0
                 ep = emission_matrix[i, x[j]]
-                mx, mxi = mat[0, j + offset] + transition_matrix[0, i] + ep, 0
+                mx, mxi = mat[(j + offset) % 2, 0] + transition_matrix[0, i] + ep, 0
                 for i2 in range(1, n_row):
-                    offset = -1 if i not in deletion_states else 0
-                    pr = mat[i2, j + offset] + transition_matrix[i2, i] + ep
+                    offset = -1 if not deletion_states[i] else 0
+                    pr = mat[(j + offset) % 2, i2] + transition_matrix[i2, i] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i, j], mat_tb[i, j] = mx, mxi
+                mat[j % 2, i], mat_tb[i, j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0, n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2, 0], 0
         for i in range(1, n_row):
-            if mat[i, n_col - 1] > omx:
-                omx, omxi = mat[i, n_col - 1], i
+            if mat[(n_col - 1) % 2, i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2, i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -148,21 +155,23 @@ class HMMNumba(HMM):
         return omx, path
 
     def viterbi(self, x: str) -> Tuple[float, str]:
-        return HMM.calculate_viterbi(
+        return HMMNumba.calculate_viterbi(
             self.Q,
             self.A,
             self.E,
             self.I,
             self.convert_symbols(x),
-            deletion_states=self.deletion_states_mapped,
+            deletion_states=self.deletion_mask,
+            traceback_dtype=traceback_dtype(self.q_len),
         )
 
     def viterbi_log(self, x: str) -> Tuple[float, str]:
-        return HMM.calculate_viterbi_log(
+        return HMMNumba.calculate_viterbi_log(
             self.Q,
             self.A_log,
             self.E_log,
             self.I_log,
             self.convert_symbols(x),
-            deletion_states=self.deletion_states_mapped,
+            deletion_states=self.deletion_mask,
+            traceback_dtype=traceback_dtype(self.q_len),
         )
@@ -0,0 +1,187 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Parallel decoding over a process pool with the model in shared memory"""
+import multiprocessing as mp
+import numpy as np
+import os
+import sys
+
+from functools import partial
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+
+# Matrices shipped to the workers, every backend can be rebuilt from them
+ARRAYS = ["A", "E", "I", "A_log", "E_log", "I_log"]
+
+# Upper bound on the number of sequences sent to a worker at once
+CHUNK_SIZE = 1024
+
+# Model and shared memory block of the current worker process
+worker = {}
+
+
+def initialize_worker(cls, states, symbols, name, layout, method, batch):
+
+    # Keep the block open for as long as the arrays look into it
+    block = shared_memory.SharedMemory(name=name)
+    arrays = []
+    for offset, shape in layout:
+        array = np.ndarray(shape, dtype=np.float64, buffer=block.buf, offset=offset)
+        array.flags.writeable = False
+        arrays.append(array)
+
+    worker["block"] = block
+    worker["hmm"] = hmm = cls.from_arrays(states, symbols, *arrays)
+
+    # The pool already runs a process per core, Numba kernels with prange such
+    # as viterbi_ragged_log would otherwise start a thread per core in each
+    if "numba" in sys.modules:
+        sys.modules["numba"].set_num_threads(1)
+
+    # Either the name of a decoding method or a function of the model
+    if isinstance(method, str):
+        worker["decode"] = getattr(hmm, method)
+    else:
+        worker["decode"] = partial(method, hmm)
+    worker["batch"] = batch
+
+
+def decode_chunk(chunk: Tuple[int, List[str]]) -> Tuple[int, list]:
+
+    start, sequences = chunk
+    decode = worker["decode"]
+
+    if worker["batch"]:
+        return start, decode(sequences)
+    return start, [decode(x) for x in sequences]
+
+
+class ParallelDecoder(object):
+    def __init__(
+        self,
+        hmm,
+        method: Union[str, Callable] = "viterbi_log",
+        processes: int = None,
+        batch: bool = False,
+        context: str = None,
+    ):
+
+        # One worker per core this process may run on
+        if processes is None:
+            if hasattr(os, "sched_getaffinity"):
+                processes = len(os.sched_getaffinity(0))
+            else:
+                processes = os.cpu_count()
+        self.processes = processes
+
+        # Copy the matrices into one shared memory block, each aligned to 64 bytes
+        arrays = [np.asarray(getattr(hmm, name), dtype=np.float64) for name in ARRAYS]
+        layout, size = [], 0
+        for array in arrays:
+            layout.append((size, array.shape))
+            size += -(-array.nbytes // 64) * 64
+        self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (offset, shape), array in zip(layout, arrays):
+            shared = np.ndarray(
+                shape, dtype=np.float64, buffer=self.block.buf, offset=offset
+            )
+            shared[...] = array
+
+        # Forking a process that already runs threads, such as the numba prange
+        # workers, can leave it hanging on exit
+        if context is None:
+            if "forkserver" in mp.get_all_start_methods():
+                context = "forkserver"
+            else:
+                context = "spawn"
+
+        self.pool = mp.get_context(context).Pool(
+            self.processes,
+            initializer=initialize_worker,
+            initargs=(
+                type(hmm),
+                list(hmm.Q),
+                list(hmm.S),
+                self.block.name,
+                layout,
+                method,
+                batch,
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def chunks(
+        self, sequences: Iterable[str], chunk_size: int = None
+    ) -> Iterator[Tuple[int, List[str]]]:
+
+        # About four chunks per worker when the number of sequences is known
+        if chunk_size is None:
+            chunk_size = CHUNK_SIZE
+            if hasattr(sequences, "__len__"):
+                chunk_size = -(-len(sequences) // (4 * self.processes))
+                chunk_size = max(1, min(CHUNK_SIZE, chunk_size))
+
+        iterator, start = iter(sequences), 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    def imap_unordered(
+        self, sequences: Iterable[str], chunk_size: int = None
+    ) -> Iterator[Tuple[int, Tuple[float, str]]]:
+
+        # Results arrive as their chunks finish, paired with the sequence index
+        for start, results in self.pool.imap_unordered(
+            decode_chunk, self.chunks(sequences, chunk_size)
+        ):
+            for index, result in enumerate(results, start):
+                yield index, result
+
+    def map(
+        self, sequences: Iterable[str], chunk_size: int = None
+    ) -> List[Tuple[float, str]]:
+
+        # Reassemble the results in the order of the sequences
+        results = {}
+        for index, result in self.imap_unordered(sequences, chunk_size):
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
+    def close(self):
+
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
@@ -0,0 +1,198 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Profile Hidden Markov Model with Match/Insert/Delete recurrences using Numba"""
+import numba as nb
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+from hmm.hmm_jhu_profile import HMM
+
+# State types, also the order of the rows of the per-type score and traceback tables
+MATCH, INSERT, DELETE = 0, 1, 2
+
+# Rows of the transition table, indexed as 3 * source type + destination type
+TRANSITIONS = [(s, d) for s in "MID" for d in "MID"]
+
+
+class ProfileHMM(HMM):
+
+    # Labels of the silent begin and end states
+    begin, end = "Begin", "End"
+
+    def __init__(
+        self,
+        transition_matrix: Dict[str, float],
+        emission_matrix: Dict[str, float],
+        initial_probabilities: Dict[str, float],
+        begin: str = "Begin",
+        end: str = "End",
+    ):
+        self.begin, self.end = begin, end
+        super().__init__(transition_matrix, emission_matrix, initial_probabilities)
+
+    def initialize(self, *args, **kwargs):
+        super().initialize(*args, **kwargs)
+
+        # Node k of the profile has the states Mk, Ik and Dk, node 0 is Begin and I0
+        self.nodes = {}
+        for q in self.Q:
+            if q[:1] in ("M", "I", "D") and q[1:].isdigit():
+                self.nodes[(q[:1], int(q[1:]))] = q
+        self.nodes[("M", 0)] = self.begin
+        self.n_nodes = max([k for (t, k) in self.nodes if t == "M"])
+
+        # P_state[t, k], state label of type t at node k
+        self.P_state = [
+            [self.nodes.get((t, k)) for k in range(self.n_nodes + 1)] for t in "MID"
+        ]
+
+        # P_log[3 * s + d, k], transition from type s at node k to type d at node
+        # k + 1 (Match, Delete) or at node k (Insert)
+        self.P_log = np.zeros(shape=(9, self.n_nodes + 1), dtype=np.float64)
+        for row, (s, d) in enumerate(TRANSITIONS):
+            for k in range(self.n_nodes + 1):
+                destination = k if d == "I" else k + 1
+                self.P_log[row, k] = self.transition_log(
+                    self.nodes.get((s, k)), self.nodes.get((d, destination))
+                )
+
+        # P_end_log[t], transition from type t at the last node to the end state
+        self.P_end_log = np.array(
+            [
+                self.transition_log(self.P_state[t][self.n_nodes], self.end)
+                for t in range(3)
+            ]
+        )
+
+        # P_emission_log[t, k, s], emission of symbol s by type t at node k
+        self.P_emission_log = np.full(
+            shape=(2, self.n_nodes + 1, self.s_len), fill_value=-np.inf
+        )
+        for t in (MATCH, INSERT):
+            for k in range(1 if t == MATCH else 0, self.n_nodes + 1):
+                q = self.P_state[t][k]
+                if q is not None:
+                    self.P_emission_log[t, k] = self.E_log[self.q_map[q]]
+
+        self.P_begin_log = self.I_log[self.q_map[self.begin]]
+
+    def transition_log(self, source: str, destination: str) -> float:
+
+        # States missing from the profile are impossible rather than improbable
+        if source not in self.q_map or destination not in self.q_map:
+            return -np.inf
+        return self.A_log[self.q_map[source], self.q_map[destination]]
+
+    @staticmethod
+    @nb.jit(nopython=True, cache=True)
+    def calculate_viterbi_log(
+        transition_matrix,
+        end_transitions,
+        emission_matrix,
+        begin_log: float,
+        x: List[int],
+    ) -> Tuple[float, np.ndarray, np.ndarray]:
+
+        n_node, n_col = transition_matrix.shape[1], len(x) + 1
+
+        # Probability information
+        # S(t, k, i), score of the most likely path that ends in type t at node k
+        # after emitting i symbols, only the columns for i - 1 and i are kept
+        mat = np.full((2, 3, n_node), -np.inf)
+
+        # Traceback information, the type of the previous state
+        mat_tb = np.zeros((n_col, 3, n_node), dtype=np.uint8)
+
+        for j in range(0, n_col):
+            c, pc = j % 2, (j - 1) % 2
+            mat[c, :, :] = -np.inf
+
+            # Only Begin (Match at node 0) is occupied before emitting anything
+            if j == 0:
+                mat[c, MATCH, 0] = begin_log
+
+            for k in range(0, n_node):
+
+                # Match and Insert emit x[j - 1] and come from the previous column
+                if j > 0:
+                    for t in (MATCH, INSERT):
+                        k2 = k - 1 if t == MATCH else k
+                        if k2 < 0:
+                            continue
+                        mx, mxi = -np.inf, MATCH
+                        for s in range(3):
+                            pr = mat[pc, s, k2] + transition_matrix[3 * s + t, k2]
+                            if pr > mx:
+                                mx, mxi = pr, s
+                        mat[c, t, k] = mx + emission_matrix[t, k, x[j - 1]]
+                        mat_tb[j, t, k] = mxi
+
+                # Delete is silent and comes from the previous node in this column
+                if k > 0:
+                    mx, mxi = -np.inf, MATCH
+                    for s in range(3):
+                        pr = mat[c, s, k - 1] + transition_matrix[3 * s + DELETE, k - 1]
+                        if pr > mx:
+                            mx, mxi = pr, s
+                    mat[c, DELETE, k] = mx
+                    mat_tb[j, DELETE, k] = mxi
+
+        # Find the final state type with maximal probability
+        last = (n_col - 1) % 2
+        omx, omxi = mat[last, MATCH, n_node - 1] + end_transitions[MATCH], MATCH
+        for t in (INSERT, DELETE):
+            if mat[last, t, n_node - 1] + end_transitions[t] > omx:
+                omx, omxi = mat[last, t, n_node - 1] + end_transitions[t], t
+
+        # Backtrace until Begin, collecting (type, node) pairs
+        t, k, j = omxi, n_node - 1, n_col - 1
+        types, nodes = [], []
+        while not (t == MATCH and k == 0):
+            types.append(t)
+            nodes.append(k)
+            t2 = mat_tb[j, t, k]
+            if t != INSERT:
+                k -= 1
+            if t != DELETE:
+                j -= 1
+            t = t2
+
+        return omx, np.array(types[::-1]), np.array(nodes[::-1])
+
+    def viterbi(self, x: str) -> Tuple[float, str]:
+        score, path = self.viterbi_log(x)
+        return 2.0 ** score, path
+
+    def viterbi_log(self, x: str) -> Tuple[float, str]:
+        score, types, nodes = ProfileHMM.calculate_viterbi_log(
+            self.P_log,
+            self.P_end_log,
+            self.P_emission_log,
+            self.P_begin_log,
+            self.convert_symbols(x),
+        )
+
+        # Build path
+        path = "".join([self.P_state[t][k] for t, k in zip(types, nodes)])
+
+        return score, path
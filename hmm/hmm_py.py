@@ -21,8 +21,8 @@
 # SOFTWARE.
 """Hidden Markov Model in CPython"""
 import math
-import pandas as pd
 
+from array import array
 from typing import Dict, List, Tuple
 
 
@@ -30,6 +30,22 @@ def log2(x):
     return -10000 if x == 0 else math.log2(x)
 
 
+def logsumexp2(values: List[float]) -> float:
+
+    # log2 of the sum of 2 ** v, shifted by the maximum so nothing underflows
+    mx = max(values)
+    return mx + math.log2(sum([2.0 ** (v - mx) for v in values]))
+
+
+def traceback_typecode(n_states: int) -> str:
+
+    # Smallest unsigned integer typecode that can hold every state index
+    for typecode in ("B", "H", "I", "L"):
+        if n_states <= 1 << (8 * array(typecode).itemsize):
+            return typecode
+    return "Q"
+
+
 class HMM(object):
     def __init__(
         self,
@@ -107,8 +123,53 @@ class HMM(object):
         self.E_log = [[log2(x) for x in y] for y in self.E]
         self.I_log = [log2(x) for x in self.I]
 
+    @classmethod
+    def from_arrays(
+        cls,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        transition_matrix_log=None,
+        emission_matrix_log=None,
+        initial_probabilities_log=None,
+    ):
+
+        hmm = cls.__new__(cls)
+        hmm.Q, hmm.S = list(states), list(symbols)
+        hmm.q_len, hmm.s_len = len(hmm.Q), len(hmm.S)
+
+        # Create maps from states and symbols to integers that functions as unique identifiers
+        hmm.q_map = {q: i for i, q in enumerate(hmm.Q)}
+        hmm.s_map = {s: i for i, s in enumerate(hmm.S)}
+
+        # The loops index nested lists, rows are expected to be stochastic
+        hmm.A = [[float(x) for x in y] for y in transition_matrix]
+        hmm.E = [[float(x) for x in y] for y in emission_matrix]
+        hmm.I = [float(x) for x in initial_probabilities]
+
+        # Create log-base-2 versions for log-space functions
+        if transition_matrix_log is None:
+            hmm.A_log = [[log2(x) for x in y] for y in hmm.A]
+        else:
+            hmm.A_log = [[float(x) for x in y] for y in transition_matrix_log]
+        if emission_matrix_log is None:
+            hmm.E_log = [[log2(x) for x in y] for y in hmm.E]
+        else:
+            hmm.E_log = [[float(x) for x in y] for y in emission_matrix_log]
+        if initial_probabilities_log is None:
+            hmm.I_log = [log2(x) for x in hmm.I]
+        else:
+            hmm.I_log = [float(x) for x in initial_probabilities_log]
+
+        return hmm
+
     def __repr__(self):
 
+        # Only needed for printing, kept off the decoding import path
+        import pandas as pd
+
         transition_data_frame = pd.DataFrame(self.A).rename(
             columns=lambda s: self.Q.__getitem__(int(s)),
             index=lambda s: self.Q.__getitem__(int(s)),
@@ -174,32 +235,34 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] * initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j - 1] * transition_matrix[0][i] * ep, 0
+                mx, mxi = mat[(j - 1) % 2][0] * transition_matrix[0][i] * ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2][j - 1] * transition_matrix[i2][i] * ep
+                    pr = mat[(j - 1) % 2][i2] * transition_matrix[i2][i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -224,32 +287,34 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] + initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j - 1] + transition_matrix[0][i] + ep, 0
+                mx, mxi = mat[(j - 1) % 2][0] + transition_matrix[0][i] + ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2][j - 1] + transition_matrix[i2][i] + ep
+                    pr = mat[(j - 1) % 2][i2] + transition_matrix[i2][i] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -262,6 +327,61 @@ class HMM(object):
 
         return omx, path
 
+    @staticmethod
+    def calculate_forward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> List[List[float]]:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # F(k, i), log2 probability of emitting x[0..i] and ending in p(i) = k
+        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+
+        # Fill in first column
+        for i in range(0, n_row):
+            mat[i][0] = emission_matrix[i][x[0]] + initial_probabilities[i]
+
+        # Fill in the rest of the mat table, summing over the previous states
+        for j in range(1, n_col):
+            for i in range(0, n_row):
+                mat[i][j] = (
+                    logsumexp2(
+                        [
+                            mat[i2][j - 1] + transition_matrix[i2][i]
+                            for i2 in range(0, n_row)
+                        ]
+                    )
+                    + emission_matrix[i][x[j]]
+                )
+
+        return mat
+
+    @staticmethod
+    def calculate_backward_log(
+        transition_matrix, emission_matrix, initial_probabilities, x: List[int]
+    ) -> List[List[float]]:
+
+        n_row, n_col = len(initial_probabilities), len(x)
+
+        # Probability information
+        # B(k, i), log2 probability of emitting x[i + 1..] given p(i) = k
+        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+
+        # Fill in the columns from the last one, summing over the next states
+        for j in range(n_col - 2, -1, -1):
+            for i in range(0, n_row):
+                mat[i][j] = logsumexp2(
+                    [
+                        transition_matrix[i][i2]
+                        + emission_matrix[i2][x[j + 1]]
+                        + mat[i2][j + 1]
+                        for i2 in range(0, n_row)
+                    ]
+                )
+
+        return mat
+
     def convert_symbols(self, x: str) -> List[int]:
         return list(map(self.s_map.get, x))
 
@@ -317,4 +437,44 @@ class HMM(object):
             self.Q, self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
         )
 
+    def forward_log(self, x: str) -> Tuple[float, List[List[float]]]:
+        mat = HMM.calculate_forward_log(
+            self.A_log, self.E_log, self.I_log, self.convert_symbols(x)
+        )
+        return logsumexp2([row[-1] for row in mat]), mat
+
+    def backward_log(self, x: str) -> Tuple[float, List[List[float]]]:
+        x = self.convert_symbols(x)
+        mat = HMM.calculate_backward_log(self.A_log, self.E_log, self.I_log, x)
+        likelihood = logsumexp2(
+            [
+                self.I_log[i] + self.E_log[i][x[0]] + mat[i][0]
+                for i in range(0, self.q_len)
+            ]
+        )
+        return likelihood, mat
+
+    def likelihood_log(self, x: str) -> float:
+        return self.forward_log(x)[0]
+
+    def posterior(self, x: str) -> List[List[float]]:
+
+        # P(p(i) = k | x) = F(k, i) * B(k, i) / P(x)
+        likelihood, forward = self.forward_log(x)
+        _, backward = self.backward_log(x)
+        return [
+            [2.0 ** (f + b - likelihood) for f, b in zip(row_f, row_b)]
+            for row_f, row_b in zip(forward, backward)
+        ]
+
+    def posterior_decoding(self, x: str) -> str:
+        mat = self.posterior(x)
+
+        # Most probable state at every step on its own
+        p = [
+            max(range(0, self.q_len), key=lambda i: mat[i][j]) for j in range(0, len(x))
+        ]
+
+        return "".join([self.Q[q] for q in p])
+
     pass
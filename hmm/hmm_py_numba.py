@@ -22,9 +22,10 @@
 """Hidden Markov Model in CPython with Numba"""
 import numba as nb
 
+from array import array
 from typing import List, Tuple
 
-from hmm.hmm_py import HMM
+from hmm.hmm_py import HMM, traceback_typecode
 
 
 class HMMNumba(HMM):
@@ -36,7 +37,7 @@ class HMMNumba(HMM):
         m.viterbi("a")
 
         # HMMNumba.calculate_viterbi_log(m.Q, m.A_log, m.E_log, m.I_log, m.convert_symbols("a"))
-        m.viterbi("a")
+        m.viterbi_log("a")
 
     @staticmethod
     @nb.jit(forceobj=True)
@@ -51,32 +52,34 @@ class HMMNumba(HMM):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] * initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j - 1] * transition_matrix[0][i] * ep, 0
+                mx, mxi = mat[(j - 1) % 2][0] * transition_matrix[0][i] * ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2][j - 1] * transition_matrix[i2][i] * ep
+                    pr = mat[(j - 1) % 2][i2] * transition_matrix[i2][i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -102,32 +105,34 @@ class HMMNumba(HMM):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] + initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
             for i in range(0, n_row):
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j - 1] + transition_matrix[0][i] + ep, 0
+                mx, mxi = mat[(j - 1) % 2][0] + transition_matrix[0][i] + ep, 0
                 for i2 in range(1, n_row):
-                    pr = mat[i2][j - 1] + transition_matrix[i2][i] + ep
+                    pr = mat[(j - 1) % 2][i2] + transition_matrix[i2][i] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
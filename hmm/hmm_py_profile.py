@@ -21,10 +21,12 @@
 # SOFTWARE.
 """Profile Hidden Markov Model in CPython"""
 import math
-import pandas as pd
 
+from array import array
 from typing import Dict, List, Tuple
 
+from hmm.hmm_py import traceback_typecode
+
 
 def log2(x):
     return -10000 if x == 0 else math.log2(x)
@@ -111,8 +113,57 @@ class HMM(object):
         self.deletion_states = [q for q in self.Q if str(q).startswith("D")]
         self.deletion_states_mapped = [self.q_map[q] for q in self.deletion_states]
 
+    @classmethod
+    def from_arrays(
+        cls,
+        states: List[str],
+        symbols: List[str],
+        transition_matrix,
+        emission_matrix,
+        initial_probabilities,
+        transition_matrix_log=None,
+        emission_matrix_log=None,
+        initial_probabilities_log=None,
+    ):
+
+        hmm = cls.__new__(cls)
+        hmm.Q, hmm.S = list(states), list(symbols)
+        hmm.q_len, hmm.s_len = len(hmm.Q), len(hmm.S)
+
+        # Create maps from states and symbols to integers that functions as unique identifiers
+        hmm.q_map = {q: i for i, q in enumerate(hmm.Q)}
+        hmm.s_map = {s: i for i, s in enumerate(hmm.S)}
+
+        # The loops index nested lists, rows are expected to be stochastic
+        hmm.A = [[float(x) for x in y] for y in transition_matrix]
+        hmm.E = [[float(x) for x in y] for y in emission_matrix]
+        hmm.I = [float(x) for x in initial_probabilities]
+
+        # Create log-base-2 versions for log-space functions
+        if transition_matrix_log is None:
+            hmm.A_log = [[log2(x) for x in y] for y in hmm.A]
+        else:
+            hmm.A_log = [[float(x) for x in y] for y in transition_matrix_log]
+        if emission_matrix_log is None:
+            hmm.E_log = [[log2(x) for x in y] for y in hmm.E]
+        else:
+            hmm.E_log = [[float(x) for x in y] for y in emission_matrix_log]
+        if initial_probabilities_log is None:
+            hmm.I_log = [log2(x) for x in hmm.I]
+        else:
+            hmm.I_log = [float(x) for x in initial_probabilities_log]
+
+        # Save deletion states
+        hmm.deletion_states = [q for q in hmm.Q if str(q).startswith("D")]
+        hmm.deletion_states_mapped = [hmm.q_map[q] for q in hmm.deletion_states]
+
+        return hmm
+
     def __repr__(self):
 
+        # Only needed for printing, kept off the decoding import path
+        import pandas as pd
+
         transition_data_frame = pd.DataFrame(self.A).rename(
             columns=lambda s: self.Q.__getitem__(int(s)),
             index=lambda s: self.Q.__getitem__(int(s)),
@@ -182,34 +233,37 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] * initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] * initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2] = [0.0 for x in range(n_row)]
             for i in range(0, n_row):
                 offset = -1 if i not in deletion_states else 0
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j + offset] * transition_matrix[0][i] * ep, 0
+                mx, mxi = mat[(j + offset) % 2][0] * transition_matrix[0][i] * ep, 0
                 for i2 in range(1, n_row):
                     offset = -1 if i2 not in deletion_states else 0
-                    pr = mat[i2][j + offset] * transition_matrix[i2][i] * ep
+                    pr = mat[(j + offset) % 2][i2] * transition_matrix[i2][i] * ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -238,34 +292,37 @@ class HMM(object):
         n_row, n_col = len(states), len(x)
 
         # Probability information
-        # S(k, i), score of the most likely path up to step i with p(i) = k
-        mat = [[0.0 for x in range(n_col)] for y in range(n_row)]
+        # S(k, i), score of the most likely path up to step i with p(i) = k,
+        # only the columns for steps i - 1 and i are kept
+        mat = [[0.0 for x in range(n_row)] for y in range(2)]
 
         # Traceback information
-        mat_tb = [[0 for x in range(n_col)] for y in range(n_row)]
+        typecode = traceback_typecode(n_row)
+        mat_tb = [array(typecode, [0]) * n_col for y in range(n_row)]
 
         # Fill in first column
         for i in range(0, n_row):
-            mat[i][0] = emission_matrix[i][x[0]] + initial_probabilities[i]
+            mat[0][i] = emission_matrix[i][x[0]] + initial_probabilities[i]
 
         # Fill in the rest of the mat and mat_tb tables
         for j in range(1, n_col):
+            mat[j % 2] = [0.0 for x in range(n_row)]
             for i in range(0, n_row):
                 offset = -1 if i not in deletion_states else 0
                 ep = emission_matrix[i][x[j]]
-                mx, mxi = mat[0][j + offset] + transition_matrix[0][i] + ep, 0
+                mx, mxi = mat[(j + offset) % 2][0] + transition_matrix[0][i] + ep, 0
                 for i2 in range(1, n_row):
                     offset = -1 if i2 not in deletion_states else 0
-                    pr = mat[i2][j + offset] + transition_matrix[i2][i] + ep
+                    pr = mat[(j + offset) % 2][i2] + transition_matrix[i2][i] + ep
                     if pr > mx:
                         mx, mxi = pr, i2
-                mat[i][j], mat_tb[i][j] = mx, mxi
+                mat[j % 2][i], mat_tb[i][j] = mx, mxi
 
         # Find the final state with maximal probability
-        omx, omxi = mat[0][n_col - 1], 0
+        omx, omxi = mat[(n_col - 1) % 2][0], 0
         for i in range(1, n_row):
-            if mat[i][n_col - 1] > omx:
-                omx, omxi = mat[i][n_col - 1], i
+            if mat[(n_col - 1) % 2][i] > omx:
+                omx, omxi = mat[(n_col - 1) % 2][i], i
 
         # Backtrace
         i, p = omxi, [omxi]
@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 """HMM Testing"""
+
 import unittest
 
 
@@ -162,6 +163,849 @@ L -1.0"
         self.assertAlmostEqual(score_e, score_a)
         self.assertEqual(path_e, path_a)
 
+    def test_hmm_jhu_hmm_matches_hmm_py(self):
+
+        from hmm.hmm_jhu import HMM as HMMJHU
+        from hmm.hmm_py import HMM as HMMPy
+
+        values = (
+            {
+                "A-A": 0.5,
+                "A-B": 0.33,
+                "A-D": 0.17,
+                "B-B": 0.5,
+                "B-A": 0.17,
+                "B-D": 0.33,
+                "D-D": 0.5,
+                "D-A": 0.33,
+                "D-B": 0.17,
+            },  # Transition matrix
+            {
+                "A-0": 0.5,
+                "A-1": 0.5,
+                "B-0": 0.75,
+                "B-1": 0.25,
+                "D-0": 0.25,
+                "D-1": 0.75,
+            },  # Emission matrix
+            {"A": 1.0, "B": 0.0, "D": 0.0},
+        )  # Initial probabilities
+        hmm_jhu, hmm_py = HMMJHU(*values), HMMPy(*values)
+
+        for observation in ["0", "0110110111", "0011100101" * 20]:
+            score_e, path_e = hmm_py.viterbi_log(observation)
+            score_a, path_a = hmm_jhu.viterbi_log(observation)
+
+            self.assertAlmostEqual(score_e, score_a)
+            self.assertEqual(path_e, path_a)
+
+            score_e, path_e = hmm_py.viterbi(observation)
+            score_a, path_a = hmm_jhu.viterbi(observation)
+
+            self.assertAlmostEqual(score_e, score_a)
+            self.assertEqual(path_e, path_a)
+
+    def test_hmm_jhu_viterbi_batch(self):
+
+        from hmm.hmm_jhu import HMM
+        from hmm.hmm_jhu_numba import HMMNumba
+
+        values = (
+            {"F-F": 0.6, "F-L": 0.4, "L-F": 0.4, "L-L": 0.6},  # Transition matrix
+            {"F-H": 0.5, "F-T": 0.5, "L-H": 0.8, "L-T": 0.2},  # Emission matrix
+            {"F": 0.5, "L": 0.5},
+        )  # Initial probabilities
+
+        observations = ["THTHHHTHTTH", "H", "TTHH", "THTHHHTHTTH" * 10, "HHTT"]
+
+        for hmm in [HMM(*values), HMMNumba(*values)]:
+            results_e = [hmm.viterbi(observation) for observation in observations]
+            results_a = hmm.viterbi_batch(observations, batch_size=1)
+
+            for (score_e, path_e), (score_a, path_a) in zip(results_e, results_a):
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+            results_e = [hmm.viterbi_log(observation) for observation in observations]
+            results_a = hmm.viterbi_batch_log(observations)
+
+            for (score_e, path_e), (score_a, path_a) in zip(results_e, results_a):
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+    def test_hmm_jhu_viterbi_log_checkpoint(self):
+
+        import random
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+
+        for length in [1, 2, 10, 99, 500]:
+            observation = "".join([random.choice("acgt") for _ in range(length)])
+            score_e, path_e = hmm.viterbi_log(observation)
+
+            for interval in [None, 1, 7, length]:
+                score_a, path_a = hmm.viterbi_log_checkpoint(observation, interval)
+
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+    def test_traceback_dtype(self):
+
+        import numpy as np
+        from hmm.hmm_jhu import traceback_dtype
+        from hmm.hmm_py import traceback_typecode
+
+        self.assertEqual(np.uint8, traceback_dtype(1))
+        self.assertEqual(np.uint8, traceback_dtype(256))
+        self.assertEqual(np.uint16, traceback_dtype(257))
+        self.assertEqual(np.uint32, traceback_dtype(65537))
+
+        self.assertEqual("B", traceback_typecode(256))
+        self.assertEqual("H", traceback_typecode(257))
+
+    def test_hmm_jhu_online_viterbi(self):
+
+        import random
+        from hmm.hmm_jhu_online import OnlineViterbi
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        observation = "".join([random.choice("acgt") for _ in range(300)])
+        score_e, path_e = hmm.viterbi_log(observation)
+
+        decoder, path_a = OnlineViterbi(hmm), []
+        for i in range(0, len(observation), 7):
+            decoder.push(observation[i : i + 7])
+            path_a.extend(decoder)
+        score_a = decoder.flush()
+        path_a.extend(decoder)
+
+        self.assertAlmostEqual(score_e, score_a)
+        self.assertEqual(path_e, "".join(path_a))
+
+        decoder, path_a = OnlineViterbi(hmm, lag=5), []
+        for symbol in observation:
+            decoder.push(symbol)
+            path_a.extend(decoder)
+            self.assertLessEqual(len(decoder.window), 5)
+        decoder.flush()
+        path_a.extend(decoder)
+
+        self.assertEqual(len(observation), len(path_a))
+
+    def test_hmm_jhu_viterbi_log_sparse(self):
+
+        import random
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        hmm_numba = HMMNumba.__new__(HMMNumba)
+        hmm_numba.__dict__.update(hmm.__dict__)
+
+        # Every transition except 0-0 is nonzero
+        self.assertEqual(80, len(hmm.pred_idx))
+
+        for length in [1, 2, 50]:
+            observation = "".join([random.choice("acgt") for _ in range(length)])
+            score_e, path_e = hmm.viterbi_log(observation)
+
+            for model in [hmm, hmm_numba]:
+                score_a, path_a = model.viterbi_log_sparse(observation)
+
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+    def test_hmm_plan7_viterbi_log(self):
+
+        import math
+        from hmm.hmm_plan7 import ProfileHMM
+        from hmm.hmm_sample import create_profile_hmm
+
+        hmm = create_profile_hmm(ProfileHMM, 1)
+
+        score_e = math.log2(
+            0.9 * 0.8 * 0.75 * 0.7 * 0.6 * 0.8 * (0.9 ** 4) * 0.95
+        )  # Begin, consensus "aggtc" through M001 to M005, End
+        score_a, path_a = hmm.viterbi_log("aggtc")
+
+        self.assertAlmostEqual(score_e, score_a)
+        self.assertEqual("M001M002M003M004M005", path_a)
+
+        _, path_a = hmm.viterbi_log("aggatc")
+        self.assertEqual("M001M002M003I003M004M005", path_a)
+
+        _, path_a = hmm.viterbi_log("agtc")
+        self.assertEqual("M001M002D003M004M005", path_a)
+
+    def test_hmm_jhu_profile_numba_dispatch(self):
+
+        from unittest import mock
+        from numba.core.dispatcher import Dispatcher
+        from hmm.hmm_jhu_profile import HMM
+        from hmm.hmm_jhu_profile_numba import HMMNumba
+        from hmm.hmm_sample import create_profile_hmm
+
+        hmm = create_profile_hmm(HMM, 1)
+        hmm_numba = create_profile_hmm(HMMNumba, 1)
+        observation = "aggtcagt"
+
+        for method in ["calculate_viterbi", "calculate_viterbi_log"]:
+            kernel = getattr(HMMNumba, method)
+            self.assertIsInstance(kernel, Dispatcher)
+
+            with mock.patch.object(HMMNumba, method, wraps=kernel) as dispatcher:
+                if method == "calculate_viterbi":
+                    score_a, path_a = hmm_numba.viterbi(observation)
+                    score_e, path_e = hmm.viterbi(observation)
+                else:
+                    score_a, path_a = hmm_numba.viterbi_log(observation)
+                    score_e, path_e = hmm.viterbi_log(observation)
+
+            dispatcher.assert_called_once()
+            self.assertTrue(kernel.signatures)
+            self.assertAlmostEqual(score_e, score_a)
+            self.assertEqual(path_e, path_a)
+
+    def test_hmm_jhu_convert_symbols(self):
+
+        import numpy as np
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        hmm = create_hmm_cpg_islands()
+        hmm_numba = HMMNumba.__new__(HMMNumba)
+        hmm_numba.__dict__.update(hmm.__dict__)
+
+        observation = "gcaatgcgcgt"
+        expected = [hmm.s_map[s] for s in observation]
+        encoded = hmm.convert_symbols(observation)
+
+        self.assertEqual(expected, encoded.tolist())
+        self.assertEqual(expected, hmm.convert_symbols(observation.encode()).tolist())
+        self.assertIs(encoded, hmm.convert_symbols(encoded))
+
+        for unknown in ["acgx", "acg\u00e9", "acg\u20ac"]:
+            with self.assertRaises(ValueError):
+                hmm.convert_symbols(unknown)
+
+        for model in [hmm, hmm_numba]:
+            self.assertEqual(model.viterbi(observation), model.viterbi(encoded))
+            self.assertEqual(model.viterbi_log(observation), model.viterbi_log(encoded))
+            self.assertEqual(
+                model.viterbi_batch_log([observation]),
+                model.viterbi_batch_log([np.array(expected)]),
+            )
+
+    def test_hmm_from_arrays(self):
+
+        import numpy as np
+        import random
+        from hmm.hmm_jhu import HMM as HMMJHU
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_jhu_profile import HMM as HMMJHUProfile
+        from hmm.hmm_plan7 import ProfileHMM
+        from hmm.hmm_py import HMM as HMMPy
+        from hmm.hmm_py_profile import HMM as HMMPyProfile
+        from hmm.hmm_sample import create_profile_hmm
+
+        random.seed(42)
+        observation = "".join([random.choice("acgt") for _ in range(20)])
+
+        for backend in [HMMJHU, HMMNumba, HMMJHUProfile, ProfileHMM]:
+            hmm_e = create_profile_hmm(backend, 3)
+            hmm_a = backend.from_arrays(hmm_e.Q, hmm_e.S, hmm_e.A, hmm_e.E, hmm_e.I)
+
+            # NumPy backends keep float64 arrays without copying
+            self.assertIs(hmm_e.A, hmm_a.A)
+            self.assertTrue(np.array_equal(hmm_e.A_log, hmm_a.A_log))
+            self.assertEqual(
+                hmm_e.viterbi_log(observation), hmm_a.viterbi_log(observation)
+            )
+
+        for backend in [HMMPy, HMMPyProfile]:
+            hmm_e = create_profile_hmm(backend, 3)
+            hmm_a = backend.from_arrays(hmm_e.Q, hmm_e.S, hmm_e.A, hmm_e.E, hmm_e.I)
+
+            self.assertEqual(hmm_e.A_log, hmm_a.A_log)
+            self.assertEqual(
+                hmm_e.viterbi_log(observation), hmm_a.viterbi_log(observation)
+            )
+
+    def test_hmm_io(self):
+
+        import numpy as np
+        import os
+        import random
+        import tempfile
+        from hmm.hmm_io import load_model, save_model
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_plan7 import ProfileHMM
+        from hmm.hmm_py import HMM as HMMPy
+        from hmm.hmm_sample import create_hmm_cpg_islands, create_profile_hmm
+
+        random.seed(42)
+        observation = "".join([random.choice("acgt") for _ in range(30)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.hmm")
+
+            hmm = create_hmm_cpg_islands()
+            save_model(hmm, path)
+            for backend in [type(hmm), HMMNumba, HMMPy]:
+                hmm_a = load_model(path, backend)
+                self.assertEqual(hmm.Q, hmm_a.Q)
+                self.assertEqual(
+                    hmm.viterbi_log(observation), hmm_a.viterbi_log(observation)
+                )
+
+            # The matrices are mapped read-only from the file
+            hmm_a = load_model(path)
+            self.assertFalse(hmm_a.A.flags.writeable)
+            self.assertTrue(np.array_equal(hmm.A_log, hmm_a.A_log))
+
+            hmm = create_profile_hmm(ProfileHMM, 3)
+            save_model(hmm, path, dtype=np.float32)
+            hmm_a = load_model(path, ProfileHMM, mmap=False)
+            self.assertEqual(
+                hmm.viterbi_log(observation)[1], hmm_a.viterbi_log(observation)[1]
+            )
+
+            with open(path, "r+b") as file:
+                file.write(b"NOPE")
+            with self.assertRaises(ValueError):
+                load_model(path)
+
+    def test_hmm_parallel_decoder(self):
+
+        import random
+        from hmm.hmm_jhu import HMM
+        from hmm.hmm_parallel import ParallelDecoder
+        from hmm.hmm_py import HMM as HMMPy
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        observations = [
+            "".join([random.choice("acgt") for _ in range(random.randint(1, 30))])
+            for _ in range(50)
+        ]
+        results_e = [hmm.viterbi_log(observation) for observation in observations]
+
+        with ParallelDecoder(hmm, processes=2) as decoder:
+            results_a = decoder.map(observations, chunk_size=7)
+            self.assertEqual(len(results_e), len(results_a))
+            for (score_e, path_e), (score_a, path_a) in zip(results_e, results_a):
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+            indices = [index for index, _ in decoder.imap_unordered(iter(observations))]
+            self.assertEqual(list(range(len(observations))), sorted(indices))
+
+        hmm_py = HMMPy.from_arrays(hmm.Q, hmm.S, hmm.A, hmm.E, hmm.I)
+        with ParallelDecoder(hmm_py, method=HMMPy.viterbi_log, processes=2) as decoder:
+            for (score_e, path_e), (score_a, path_a) in zip(
+                results_e, decoder.map(observations)
+            ):
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+        with ParallelDecoder(hmm, "viterbi_batch_log", 2, batch=True) as decoder:
+            self.assertEqual(
+                hmm.viterbi_batch_log(observations), decoder.map(observations)
+            )
+
+    def test_hmm_jhu_numba_viterbi_ragged_log(self):
+
+        import random
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        hmm = HMMNumba.from_arrays(hmm.Q, hmm.S, hmm.A, hmm.E, hmm.I)
+
+        observations = [
+            "".join([random.choice("acgt") for _ in range(random.randint(1, 60))])
+            for _ in range(40)
+        ]
+        results_e = [hmm.viterbi_log(observation) for observation in observations]
+
+        for results_a in [
+            hmm.viterbi_ragged_log(observations),
+            hmm.viterbi_ragged_log(observations, parallel=False),
+            hmm.viterbi_threaded_log(observations, threads=3, chunk_size=6),
+        ]:
+            self.assertEqual(len(results_e), len(results_a))
+            for (score_e, path_e), (score_a, path_a) in zip(results_e, results_a):
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+    def test_hmm_aot(self):
+
+        import random
+        from hmm.hmm_aot import HMMAot
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        hmm = create_hmm_cpg_islands()
+        try:
+            hmm_aot = HMMAot.from_arrays(hmm.Q, hmm.S, hmm.A, hmm.E, hmm.I)
+        except ImportError:
+            self.skipTest("the kernels are not compiled, run python -m hmm.hmm_aot")
+
+        random.seed(42)
+        observations = [
+            "".join([random.choice("acgt") for _ in range(random.randint(1, 40))])
+            for _ in range(20)
+        ]
+
+        self.assertEqual(
+            hmm.viterbi_batch_log(observations), hmm_aot.viterbi_batch_log(observations)
+        )
+        for observation in observations:
+            self.assertEqual(hmm.viterbi(observation), hmm_aot.viterbi(observation))
+            self.assertEqual(
+                hmm.viterbi_log(observation), hmm_aot.viterbi_log(observation)
+            )
+
+    def test_import_time(self):
+
+        from benchmarks.imports import measure
+
+        # Decoding must not pay for the libraries used only for printing and plots
+        for module in ["hmm.hmm_py", "hmm.hmm_jhu", "hmm.hmm_aot", "hmm.hmm_decode"]:
+            result = measure(module)
+            self.assertNotIn("pandas", result["modules"])
+            self.assertNotIn("matplotlib", result["modules"])
+            self.assertNotIn("numba", result["modules"])
+
+    def test_hmm_jhu_forward_backward(self):
+
+        import itertools
+        import math
+        from hmm.hmm_jhu import HMM as HMMJHU
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_py import HMM as HMMPy
+
+        values = (
+            {"F-F": 0.9, "F-L": 0.1, "L-F": 0.1, "L-L": 0.9},  # Transition matrix
+            {"F-H": 0.5, "F-T": 0.5, "L-H": 0.75, "L-T": 0.25},  # Emission matrix
+            {"F": 0.5, "L": 0.5},
+        )  # Initial probabilities
+        hmms = [HMMJHU(*values), HMMNumba(*values), HMMPy(*values)]
+
+        observation = "THTHHHTH"
+
+        # Sum of the joint probability over every path
+        paths = ["".join(p) for p in itertools.product("FL", repeat=len(observation))]
+        likelihood_e = sum([hmms[0].joint_probability(p, observation) for p in paths])
+
+        for hmm in hmms:
+            likelihood_f, _ = hmm.forward_log(observation)
+            likelihood_b, _ = hmm.backward_log(observation)
+            self.assertAlmostEqual(math.log2(likelihood_e), likelihood_f)
+            self.assertAlmostEqual(math.log2(likelihood_e), likelihood_b)
+
+            posterior = hmm.posterior(observation)
+            for j in range(len(observation)):
+                self.assertAlmostEqual(1.0, sum([row[j] for row in posterior]))
+
+            self.assertEqual(
+                hmms[0].posterior_decoding(observation),
+                hmm.posterior_decoding(observation),
+            )
+
+    def test_hmm_train_baum_welch(self):
+
+        import itertools
+        import random
+        import numpy as np
+        from hmm.hmm_jhu import HMM
+        from hmm.hmm_train import baum_welch, expected_counts
+
+        hmm = HMM(
+            {"F-F": 0.9, "F-L": 0.1, "L-F": 0.1, "L-L": 0.9},  # Transition matrix
+            {"F-H": 0.5, "F-T": 0.5, "L-H": 0.75, "L-T": 0.25},  # Emission matrix
+            {"F": 0.5, "L": 0.5},
+        )  # Initial probabilities
+
+        # Expected counts weighted over every path
+        observation = "THTHHHTH"
+        A_e, E_e = np.zeros(shape=(2, 2)), np.zeros(shape=(2, 2))
+        for p in itertools.product("FL", repeat=len(observation)):
+            jp = hmm.joint_probability(p, observation)
+            for q1, q2 in zip(p, p[1:]):
+                A_e[hmm.q_map[q1], hmm.q_map[q2]] += jp
+            for q, s in zip(p, observation):
+                E_e[hmm.q_map[q], hmm.s_map[s]] += jp
+        likelihood, A_a, E_a, _ = expected_counts(hmm, observation)
+        self.assertTrue(np.allclose(A_e / 2 ** likelihood, A_a))
+        self.assertTrue(np.allclose(E_e / 2 ** likelihood, E_a))
+
+        random.seed(42)
+        observations = [
+            "".join([random.choice("HHT") for _ in range(random.randint(1, 60))])
+            for _ in range(40)
+        ]
+        hmm_e, history_e = baum_welch(hmm, observations, iterations=5)
+        hmm_a, history_a = baum_welch(hmm, observations, iterations=5, processes=2)
+
+        # EM never decreases the likelihood
+        for l1, l2 in zip(history_e, history_e[1:]):
+            self.assertGreaterEqual(l2, l1 - 1e-9)
+        self.assertTrue(np.allclose(history_e, history_a))
+        self.assertTrue(np.allclose(hmm_e.A, hmm_a.A))
+        self.assertTrue(np.allclose(hmm_e.E, hmm_a.E))
+        self.assertTrue(np.allclose(hmm_e.A.sum(axis=1), 1))
+
+        # Without sequences both paths keep the model
+        for processes in (1, 2):
+            _, history = baum_welch(hmm, ["", ""], iterations=3, processes=processes)
+            self.assertEqual([0.0, 0.0], history)
+
+        # Left-to-right model, the last state cannot go back to the first
+        hmm = HMM(
+            {"0-0": 0.5, "0-1": 0.5, "1-1": 1.0},  # Transition matrix
+            {"0-a": 0.99, "0-b": 0.01, "1-a": 0.01, "1-b": 0.99},  # Emission matrix
+            {"0": 0.5, "1": 0.5},
+        )  # Initial probabilities
+        observation = "b" * 400 + "a" * 400
+        _, A_a, E_a, I_a = expected_counts(hmm, observation)
+        self.assertTrue(np.isfinite(A_a).all())
+        self.assertEqual(0.0, A_a[1, 0])
+        self.assertAlmostEqual(len(observation) - 1, A_a.sum())
+        _, history = baum_welch(hmm, [observation], iterations=3)
+        self.assertGreater(history[-1], history[0])
+
+    def test_hmm_train_viterbi_training(self):
+
+        import random
+        import re
+        import numpy as np
+        from hmm.hmm_jhu import HMM
+        from hmm.hmm_jhu_numba import HMMNumba
+        from hmm.hmm_py import HMM as HMMPy
+        from hmm.hmm_sample import create_hmm_cpg_islands, create_profile_hmm
+        from hmm.hmm_train import path_counts, viterbi_training
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        observations = [
+            "".join([random.choice("acgt") for _ in range(random.randint(1, 60))])
+            for _ in range(40)
+        ]
+
+        # Counts along the decoded paths agree between the backends
+        hmm_py = HMMPy.from_arrays(hmm.Q, hmm.S, hmm.A, hmm.E, hmm.I)
+        counts_e = path_counts(hmm_py, observations)[0]
+        counts_a = path_counts(hmm, observations)[0]
+        self.assertAlmostEqual(counts_e[0], counts_a[0])
+        for values_e, values_a in zip(counts_e[1:], counts_a[1:]):
+            self.assertTrue(np.array_equal(values_e, values_a))
+        self.assertEqual(sum(map(len, observations)), counts_a[2].sum())
+
+        hmm = HMMNumba.from_arrays(hmm.Q, hmm.S, hmm.A, hmm.E, hmm.I)
+        hmm, history = viterbi_training(hmm, observations, iterations=5)
+        self.assertIsInstance(hmm, HMMNumba)
+        self.assertGreater(history[-1], history[0])
+        self.assertTrue(np.allclose(hmm.E.sum(axis=1), 1))
+
+        # State labels longer than a character, counted along the decoded path
+        hmm = create_profile_hmm(HMM, 1)
+        observation = "acgtacgt"
+        _, A_a, E_a, I_a = path_counts(hmm, [observation])[0]
+        path = hmm.viterbi_log(observation)[1]
+        p = [hmm.Q.index(q) for q in re.findall("Begin|End|[DIM][0-9]+", path)]
+        self.assertEqual(len(observation), len(p))
+        self.assertEqual(1, I_a[p[0]])
+        for q1, q2 in zip(p, p[1:]):
+            A_a[q1, q2] -= 1
+        self.assertFalse(A_a.any())
+        hmm, history = viterbi_training(hmm, [observation] * 4, iterations=3)
+        self.assertTrue(np.allclose(hmm.A.sum(axis=1)[hmm.A.sum(axis=1) > 0], 1))
+
+    def test_hmm_jhu_viterbi_kbest_log(self):
+
+        import itertools
+        from hmm.hmm_jhu import HMM
+        from hmm.hmm_jhu_numba import HMMNumba
+
+        values = (
+            {"F-F": 0.9, "F-L": 0.1, "L-F": 0.1, "L-L": 0.9},  # Transition matrix
+            {"F-H": 0.5, "F-T": 0.5, "L-H": 0.75, "L-T": 0.25},  # Emission matrix
+            {"F": 0.5, "L": 0.5},
+        )  # Initial probabilities
+
+        for hmm in [HMM(*values), HMMNumba(*values)]:
+            for observation in ["T", "THTHHHTH", "HHHHHHHHHT"]:
+
+                # Every path ranked by its joint probability
+                results_e = sorted(
+                    [
+                        (hmm.joint_probability_log(p, observation), "".join(p))
+                        for p in itertools.product("FL", repeat=len(observation))
+                    ],
+                    key=lambda result: -result[0],
+                )[:5]
+                results_a = hmm.viterbi_kbest_log(observation, 5)
+                self.assertEqual(min(5, 2 ** len(observation)), len(results_a))
+
+                self.assertEqual(len(results_e), len(results_a))
+                self.assertEqual(len(results_a), len(set([p for _, p in results_a])))
+                self.assertEqual(hmm.viterbi_log(observation)[1], results_a[0][1])
+                for (score_e, _), (score_a, path_a) in zip(results_e, results_a):
+                    self.assertAlmostEqual(score_e, score_a)
+                    self.assertAlmostEqual(
+                        score_a, hmm.joint_probability_log(path_a, observation)
+                    )
+
+            # More paths asked for than there are, and none at all
+            self.assertEqual(8, len(hmm.viterbi_kbest_log("HTH", 10)))
+            with self.assertRaises(ValueError):
+                hmm.viterbi_kbest_log("HTH", 0)
+
+    def test_hmm_jhu_viterbi_log_beam(self):
+
+        import random
+        from hmm.hmm_sample import create_hmm_cpg_islands
+
+        random.seed(42)
+        hmm = create_hmm_cpg_islands()
+        observations = [
+            "".join([random.choice("acgt") for _ in range(random.randint(1, 60))])
+            for _ in range(20)
+        ]
+
+        for observation in observations:
+            score_e, path_e = hmm.viterbi_log(observation)
+
+            # A beam as wide as the model is exact decoding
+            for score_a, path_a in [
+                hmm.viterbi_log_beam(observation, beam_width=hmm.q_len),
+                hmm.viterbi_log_beam(observation, threshold=1e6),
+            ]:
+                self.assertAlmostEqual(score_e, score_a)
+                self.assertEqual(path_e, path_a)
+
+            # A narrow beam still scores the path it returns
+            score_a, path_a = hmm.viterbi_log_beam(observation, beam_width=2)
+            self.assertLessEqual(score_a, score_e + 1e-9)
+            self.assertAlmostEqual(
+                score_a, hmm.joint_probability_log(path_a, observation)
+            )
+
+        agreement = hmm.beam_agreement(observations, beam_width=hmm.q_len)
+        self.assertEqual(len(observations), agreement["sequences"])
+        self.assertEqual(0.0, agreement["paths_changed"])
+        self.assertAlmostEqual(0.0, agreement["score_loss_max"])
+
+        # An empty beam or no bound at all is rejected before decoding
+        for beam_width, threshold in [(0, None), (None, -1), (None, None), (2, -1)]:
+            with self.assertRaises(ValueError):
+                hmm.viterbi_log_beam(observations[0], beam_width, threshold)
+            with self.assertRaises(ValueError):
+                hmm.beam_agreement([], beam_width, threshold)
+
+    def test_benchmarks_run(self):
+
+        from benchmarks.registry import WORKLOADS
+        from benchmarks.suite import run
+
+        results = run(["numpy", "profile_numpy"], ["casino-100"], repeat=3, warmup=0)
+
+        # Backends only run on the workloads of their model family
+        self.assertEqual(1, len(results["results"]))
+        result = results["results"][0]
+        self.assertEqual(
+            ("numpy", "casino-100"), (result["backend"], result["workload"])
+        )
+        for timing in ("construct", "decode"):
+            summary = result[timing]
+            self.assertEqual(3, len(summary["samples"]))
+            self.assertLessEqual(summary["min"], summary["median"])
+            self.assertLessEqual(summary["median"], summary["max"])
+
+        # The same sequences for the same seed
+        workload = WORKLOADS["casino-100"]
+        self.assertEqual(workload.sequences(1), workload.sequences(1))
+        self.assertNotEqual(workload.sequences(1), workload.sequences(2))
+
+    def test_benchmarks_gate(self):
+
+        import tempfile
+        from benchmarks.gate import compare, mann_whitney_u, minimum_p, save_baselines
+        from benchmarks.timing import summarize
+
+        # Every ordering of 5 against 5 samples is equally likely, one has U = 25
+        self.assertEqual((25.0, 1 / 252), mann_whitney_u([6, 7, 8, 9, 10], range(5)))
+        self.assertEqual(1.0, mann_whitney_u([1, 2, 3], [4, 5, 6])[1])
+
+        def results(samples):
+            timing = summarize(samples)
+            return {
+                "results": [
+                    {
+                        "backend": "numpy",
+                        "workload": "casino-100",
+                        "construct": timing,
+                        "decode": timing,
+                    }
+                ]
+            }
+
+        with tempfile.TemporaryDirectory() as directory:
+            save_baselines(directory, results([100, 101, 102, 103, 104, 105]))
+
+            for samples, status in [
+                ([101, 102, 103, 104, 105, 106], "ok"),
+                ([150, 151, 152, 153, 154, 155], "regression"),
+                ([50, 51, 52, 53, 54, 55], "improvement"),
+            ]:
+                for comparison in compare(directory, results(samples)):
+                    self.assertEqual(status, comparison["status"])
+
+            comparison = compare(directory + "-missing", results([1]))[0]
+            self.assertEqual("no baseline", comparison["status"])
+
+            # Three runs against six can never be significant at 0.01
+            self.assertEqual(1 / 84, minimum_p(3, 6))
+            comparison = compare(directory, results([150, 151, 152]))[0]
+            self.assertEqual("too few samples", comparison["status"])
+
+            # Baselines of another machine are only compared when allowed
+            slower = {**results([150, 151, 152, 153, 154, 155]), "environment": {}}
+            save_baselines(directory, {**slower, "environment": {"numpy": "1.0"}})
+            slower["environment"]["numpy"] = "2.0"
+            comparison = compare(directory, slower)[0]
+            self.assertEqual("environment mismatch", comparison["status"])
+            self.assertEqual(["numpy"], comparison["mismatch"])
+            comparison = compare(directory, slower, allow_environment=True)[0]
+            self.assertEqual("ok", comparison["status"])
+
+    def test_benchmarks_memory(self):
+
+        import numpy as np
+        from benchmarks.memory import measure_memory
+        from benchmarks.suite import run
+
+        memory = measure_memory(lambda: np.ones(1 << 20))
+        self.assertGreaterEqual(memory["allocated_peak"], 8 << 20)
+        self.assertGreater(memory["rss_peak"], 0)
+
+        results = run(["numpy"], ["casino-100"], repeat=1, warmup=0, memory=True)
+        self.assertGreater(results["results"][0]["memory"]["allocated_peak"], 0)
+
+    def test_benchmarks_scaling(self):
+
+        import numpy as np
+        from benchmarks.registry import BACKENDS, WORKLOADS, select_workloads
+        from benchmarks.scaling import complexity, fit_exponent
+        from benchmarks.suite import DEFAULT_WORKLOADS
+        from hmm.hmm_jhu import HMM
+
+        sizes = [2, 8, 32, 128]
+        exponent, r2 = fit_exponent(sizes, [3 * n ** 2 for n in sizes])
+        self.assertAlmostEqual(2.0, exponent)
+        self.assertAlmostEqual(1.0, r2)
+
+        # Sweeps are selected by series and are not part of the default run
+        names = select_workloads(["alphabet", "casino-100"])
+        self.assertEqual(
+            ["alphabet-2", "alphabet-4", "alphabet-16", "alphabet-64"], names[:4]
+        )
+        self.assertEqual("casino-100", names[-1])
+        self.assertNotIn("states-5000", DEFAULT_WORKLOADS)
+        with self.assertRaises(ValueError):
+            select_workloads(["unknown"])
+
+        # Random models follow the dimensions of their workload
+        hmm = WORKLOADS["density-5"].build(HMM)
+        self.assertEqual((512, 512), hmm.A.shape)
+        self.assertTrue(((hmm.A > 0).sum(axis=1) == 26).all())
+        self.assertTrue(np.allclose(hmm.A.sum(axis=1), 1))
+
+        # The sparse backends decode the same paths through the predecessor lists
+        workload = WORKLOADS["sparse-states-32"]
+        sequences = workload.sequences(42)
+        hmm = workload.build(HMM)
+        self.assertEqual(
+            workload.decode(hmm, sequences),
+            workload.decode(hmm, sequences, BACKENDS["numpy_sparse"].method),
+        )
+
+        results = {
+            "results": [
+                {"backend": "numpy", "workload": f"states-{n}", "decode": {"median": n}}
+                for n in (2, 8, 32)
+            ]
+        }
+        self.assertAlmostEqual(1.0, complexity(results)[0]["exponent"])
+
+    def test_hmm_decode(self):
+
+        import os
+        import tempfile
+        import hmm
+        from hmm import hmm_decode
+        from hmm.hmm_jhu import HMM as HMMJHU
+        from hmm.hmm_jhu_profile import HMM as HMMJHUProfile
+        from hmm.hmm_py import HMM as HMMPy
+
+        values = (
+            {"F-F": 0.9, "F-L": 0.1, "L-F": 0.1, "L-L": 0.9},  # Transition matrix
+            {"F-H": 0.5, "F-T": 0.5, "L-H": 0.75, "L-T": 0.25},  # Emission matrix
+            {"F": 0.5, "L": 0.5},
+        )  # Initial probabilities
+        observation = "THTHHHTHHHTTHHHHTHTH"
+        expected = HMMPy(*values).viterbi_log(observation)
+
+        # Every backend decodes models of every other backend the same way
+        for model in (HMMPy(*values), HMMJHU(*values)):
+            for backend in ("py", "numpy", "numpy_numba"):
+                self.assertEqual(expected, hmm.decode(model, observation, backend))
+        with self.assertRaises(ValueError):
+            hmm.decode(model, observation, "unknown")
+
+        # Profile models have no registered backend and are not converted
+        with self.assertRaises(TypeError):
+            hmm.decode(HMMJHUProfile(*values), observation)
+
+        # Calibration is written once and read back instead of measured again
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calibration.json")
+            data = hmm_decode.calibration(path, refresh=True)
+            self.assertTrue(os.path.exists(path))
+            hmm_decode.CALIBRATIONS.clear()
+            self.assertEqual(data, hmm_decode.calibration(path))
+        self.assertEqual(set(hmm_decode.BACKENDS), {*data["costs"], *data["errors"]})
+
+        # The backend with the lowest predicted time is picked for each shape
+        costs = {"py": [0.0, 0.0, 1.0], "numpy": [10.0, 0.0, 0.0]}
+        self.assertEqual("py", hmm_decode.select_backend(2, 2, costs))
+        self.assertEqual("numpy", hmm_decode.select_backend(64, 100, costs))
+
+    def test_hmm_jhu_log2_array(self):
+
+        import math
+        import numpy as np
+        from hmm.hmm_jhu import LOG2_EXACT_VALUES, log2_array
+
+        # Few nonzero values match math.log2 exactly, many are vectorized
+        rng = np.random.default_rng(42)
+        for size in (LOG2_EXACT_VALUES // 4, LOG2_EXACT_VALUES * 4):
+            x = rng.random(size)
+            x[::7] = 0
+            x_log = log2_array(x)
+            self.assertTrue((x_log[::7] == -10000).all())
+            expected = [-10000 if v == 0 else math.log2(v) for v in x]
+            if size <= LOG2_EXACT_VALUES:
+                self.assertEqual(expected, x_log.tolist())
+            self.assertTrue(np.allclose(expected, x_log, rtol=1e-15, atol=0))
+
 
 if __name__ == "__main__":
     unittest.main()
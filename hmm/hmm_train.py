@@ -0,0 +1,260 @@
+# MIT License
+#
+# Copyright (c) 2019 Elmer Nocon, Abien Fred Agarap
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Training of the HMM matrices from unlabelled sequences"""
+import numpy as np
+
+from typing import List, Tuple
+
+from hmm.hmm_jhu import BATCH_CELLS
+from hmm.hmm_parallel import ParallelDecoder
+
+# Decoders of many sequences at once, fastest first
+DECODERS = ["viterbi_ragged_log", "viterbi_batch_log"]
+
+# First code point of the one character state labels of path_counts
+STATE_OFFSET = 0x100
+
+# Log2 likelihood and expected counts of A, E and I
+Counts = Tuple[float, np.ndarray, np.ndarray, np.ndarray]
+
+
+def expected_counts(hmm, x: str) -> Counts:
+
+    likelihood, forward = hmm.forward_log(x)
+    _, backward = hmm.backward_log(x)
+    forward, backward = np.asarray(forward), np.asarray(backward)
+    x = np.asarray(hmm.convert_symbols(x))
+
+    # G(k, i), posterior probability of p(i) = k
+    mat = np.exp2(forward + backward - likelihood)
+
+    # Expected transitions in log space, summed over chunks of steps so the
+    # (steps, states, states) buffer stays bounded, with
+    # F(k, i) + A(k, l) + E(l, x(i + 1)) + B(l, i + 1) - likelihood
+    # = log P(p(i) = k, p(i + 1) = l | x)
+    ep = np.asarray(hmm.E_log)[:, x[1:]] + backward[:, 1:] - likelihood
+    fp = forward[:, :-1]
+    A_log = np.asarray(hmm.A_log)
+    A_counts = np.zeros(shape=(hmm.q_len, hmm.q_len), dtype=np.float64)
+    step = max(1, BATCH_CELLS // (hmm.q_len * hmm.q_len))
+    for i in range(0, len(x) - 1, step):
+        xi = (
+            fp[:, i : i + step].T[:, :, None]
+            + A_log[None, :, :]
+            + ep[:, i : i + step].T[:, None, :]
+        )
+        A_counts += np.exp2(xi).sum(axis=0)
+
+    # Expected emissions, one column per symbol
+    E_counts = np.zeros(shape=(hmm.q_len, hmm.s_len), dtype=np.float64)
+    for s in np.unique(x):
+        E_counts[:, s] = mat[:, x == s].sum(axis=1)
+
+    return likelihood, A_counts, E_counts, mat[:, 0]
+
+
+def accumulate_counts(hmm, sequences: List[str]) -> List[Counts]:
+
+    # One entry per chunk, so only the sums travel back from the workers
+    likelihood = 0.0
+    A_counts = np.zeros(shape=(hmm.q_len, hmm.q_len), dtype=np.float64)
+    E_counts = np.zeros(shape=(hmm.q_len, hmm.s_len), dtype=np.float64)
+    I_counts = np.zeros(shape=hmm.q_len, dtype=np.float64)
+    for x in sequences:
+        if not len(x):
+            continue
+        counts = expected_counts(hmm, x)
+        likelihood += counts[0]
+        A_counts += counts[1]
+        E_counts += counts[2]
+        I_counts += counts[3]
+
+    return [(likelihood, A_counts, E_counts, I_counts)]
+
+
+def decode_paths(hmm, sequences: List[str]) -> List[Tuple[float, str]]:
+
+    for method in DECODERS:
+        if hasattr(hmm, method):
+            return getattr(hmm, method)(sequences)
+    return [hmm.viterbi_log(x) for x in sequences]
+
+
+def path_counts(hmm, sequences: List[str]) -> List[Counts]:
+
+    sequences = [x for x in sequences if len(x)]
+
+    # Decoded paths join the state labels, which can be longer than a
+    # character, so a copy of the model with one character per state index
+    # is decoded instead
+    indexed = type(hmm).from_arrays(
+        [chr(STATE_OFFSET + i) for i in range(hmm.q_len)],
+        hmm.S,
+        hmm.A,
+        hmm.E,
+        hmm.I,
+        hmm.A_log,
+        hmm.E_log,
+        hmm.I_log,
+    )
+
+    # One entry per chunk, the likelihood is the sum of the Viterbi scores
+    likelihood = 0.0
+    A_counts = np.zeros(shape=hmm.q_len * hmm.q_len, dtype=np.float64)
+    E_counts = np.zeros(shape=hmm.q_len * hmm.s_len, dtype=np.float64)
+    I_counts = np.zeros(shape=hmm.q_len, dtype=np.float64)
+    for x, (score, path) in zip(sequences, decode_paths(indexed, sequences)):
+        p = np.frombuffer(path.encode("utf-32-le"), dtype=np.uint32) - STATE_OFFSET
+        p = p.astype(np.int64)
+        x = np.asarray(hmm.convert_symbols(x), dtype=np.int64)
+        likelihood += float(score)
+
+        # Count the transitions and emissions along the path in flat matrices
+        A_counts += np.bincount(p[:-1] * hmm.q_len + p[1:], minlength=A_counts.size)
+        E_counts += np.bincount(p * hmm.s_len + x, minlength=E_counts.size)
+        I_counts[p[0]] += 1
+
+    return [
+        (
+            likelihood,
+            A_counts.reshape(hmm.q_len, hmm.q_len),
+            E_counts.reshape(hmm.q_len, hmm.s_len),
+            I_counts,
+        )
+    ]
+
+
+def collect_counts(
+    hmm, sequences: List[str], function, processes: int = 1, chunk_size: int = None
+) -> Counts:
+
+    # A single process skips the pool and the shared memory copy of the model
+    if processes == 1:
+        return function(hmm, sequences)[0]
+
+    with ParallelDecoder(hmm, function, processes=processes, batch=True) as pool:
+        totals = [counts for _, counts in pool.imap_unordered(sequences, chunk_size)]
+
+    # No chunks, the zero counts of the single process path
+    if not totals:
+        return function(hmm, [])[0]
+    return tuple(sum(values) for values in zip(*totals))
+
+
+def normalize(counts: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+
+    # Rows without any counts keep the probabilities they had
+    sums = counts.sum(axis=-1, keepdims=True)
+    return np.where(sums > 0, counts / np.where(sums > 0, sums, 1), fallback)
+
+
+def reestimate(hmm, A_counts, E_counts, I_counts, pseudocount: float = 0.0):
+
+    # Pseudocounts only go to entries that are possible in the current model
+    A_counts = A_counts + pseudocount * (np.asarray(hmm.A) > 0)
+    E_counts = E_counts + pseudocount * (np.asarray(hmm.E) > 0)
+    I_counts = I_counts + pseudocount * (np.asarray(hmm.I) > 0)
+
+    return type(hmm).from_arrays(
+        hmm.Q,
+        hmm.S,
+        normalize(A_counts, np.asarray(hmm.A, dtype=np.float64)),
+        normalize(E_counts, np.asarray(hmm.E, dtype=np.float64)),
+        normalize(I_counts, np.asarray(hmm.I, dtype=np.float64)),
+    )
+
+
+def fit(
+    hmm,
+    sequences: List[str],
+    function,
+    iterations: int,
+    tolerance: float,
+    pseudocount: float,
+    processes: int,
+    chunk_size: int,
+):
+
+    # The summed log2 score of the sequences under the model before every update
+    history = []
+    for _ in range(iterations):
+        likelihood, A_counts, E_counts, I_counts = collect_counts(
+            hmm, sequences, function, processes, chunk_size
+        )
+        # NaN or infinite counts would otherwise pass as rows without counts
+        for counts in (A_counts, E_counts, I_counts):
+            if not np.isfinite(counts).all():
+                raise ValueError("Expected counts are not finite")
+        if history and likelihood - history[-1] < tolerance:
+            history.append(likelihood)
+            break
+        history.append(likelihood)
+        hmm = reestimate(hmm, A_counts, E_counts, I_counts, pseudocount)
+
+    return hmm, history
+
+
+def baum_welch(
+    hmm,
+    sequences: List[str],
+    iterations: int = 100,
+    tolerance: float = 1e-6,
+    pseudocount: float = 0.0,
+    processes: int = 1,
+    chunk_size: int = None,
+):
+
+    # Soft counts, the history holds the log2 likelihoods
+    return fit(
+        hmm,
+        sequences,
+        accumulate_counts,
+        iterations,
+        tolerance,
+        pseudocount,
+        processes,
+        chunk_size,
+    )
+
+
+def viterbi_training(
+    hmm,
+    sequences: List[str],
+    iterations: int = 100,
+    tolerance: float = 1e-6,
+    pseudocount: float = 1.0,
+    processes: int = 1,
+    chunk_size: int = None,
+):
+
+    # Hard counts along the Viterbi paths, the history holds the summed log2
+    # Viterbi scores
+    return fit(
+        hmm,
+        sequences,
+        path_counts,
+        iterations,
+        tolerance,
+        pseudocount,
+        processes,
+        chunk_size,
+    )